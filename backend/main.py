@@ -3,20 +3,45 @@ from __future__ import annotations
 
 from flask import Flask, jsonify, request, send_from_directory
 from pathlib import Path
+import math
+import os
 import traceback
-import time
 
-from pathfinding.grid.grid import Grid
-from pathfinding.grid.dijkstra import dijkstra
-from pathfinding.grid.astar import astar
+from pathfinding.grid.request import (
+    GridRequestError,
+    decode_binary_request,
+    decode_json_request,
+    solve_grid_request,
+)
 
-from pathfinding.osm.graph_cache import get_graph
-from pathfinding.osm.routing import route_compare_own
+from pathfinding.inflight import AdmissionControl, Coalescer, Overloaded
+from pathfinding.osm.graph_cache import get_graph, graph_key
+from pathfinding.osm.tiles import InvalidTileSetError, OutsideTilesError, get_tiled_store
+from pathfinding.osm.routing import STORAGE_MODES, route_alternatives_nodes, route_compare_nodes, snap_nodes
+from pathfinding.graph.alternatives import ALTERNATIVE_METHODS
+from pathfinding.trace import parse_trace_options
 
 FRONTEND_DIR = Path(__file__).resolve().parent.parent / "frontend"
+# Tile sets written by `python -m pathfinding.osm.tiles <dir> ...` live here
+TILES_DIR = Path(os.environ.get("PATHFINDER_TILES_DIR", Path(__file__).resolve().parent / "tiles"))
+
+# Upper bound on routes per /osm/route/alternatives query
+MAX_ALTERNATIVES = 5
 
 app = Flask(__name__, static_folder=str(FRONTEND_DIR), static_url_path="")
 
+# Identical in-flight OSM queries share one computation; admission per graph
+# (per stitched corridor for tilesets) keeps bursts from piling up threads on
+# the same graph (429 when full). Graph loads and tile stitches are coalesced
+# on their own, since other queries on the same graph still need them.
+_graph_coalescer = Coalescer()
+_route_coalescer = Coalescer()
+_route_admission = AdmissionControl(
+    max_concurrent=int(os.environ.get("PATHFINDER_MAX_CONCURRENT_PER_GRAPH", "2")),
+    max_queue=int(os.environ.get("PATHFINDER_MAX_QUEUE_PER_GRAPH", "16")),
+    queue_timeout_s=float(os.environ.get("PATHFINDER_QUEUE_TIMEOUT_S", "10")),
+)
+
 
 @app.get("/")
 def index():
@@ -32,45 +57,49 @@ def health():
 # GRID ENDPOINTS (legacy/demo)
 # ---------------------------
 
+def _decode_grid_request(algorithms=None):
+    """
+    Shared decoder for the /solve* endpoints: binary body when sent as
+    application/octet-stream (options in the query string), JSON otherwise.
+    """
+    if request.mimetype == "application/octet-stream":
+        params = request.args.to_dict()
+        if algorithms is not None:
+            params["algorithms"] = ",".join(algorithms)
+        return decode_binary_request(request.get_data(cache=False), params)
+    return decode_json_request(request.get_json(force=True, silent=True), algorithms)
+
+
+def _solve_grid(algorithms=None):
+    """Decodes, validates and solves a grid request; returns (results, None) or (None, error response)."""
+    try:
+        req = _decode_grid_request(algorithms)
+    except GridRequestError as e:
+        return None, (jsonify({"error": str(e)}), 400)
+    return solve_grid_request(req), None
+
+
+@app.post("/solve")
+def solve():
+    try:
+        results, err = _solve_grid()
+        if err:
+            return err
+        return jsonify(results)
+
+    except Exception as e:
+        tb = traceback.format_exc()
+        print(tb, flush=True)
+        return jsonify({"error": str(e), "traceback": tb}), 500
+
+
 @app.post("/solve/dijkstra")
 def solve_dijkstra():
     try:
-        data = request.get_json(force=True)
-
-        cells = data.get("grid")
-        start = data.get("start")
-        goal = data.get("goal")
-
-        if not isinstance(cells, list) or not cells or not all(isinstance(row, list) for row in cells):
-            return jsonify({"error": "grid must be a 2D list"}), 400
-        if not (isinstance(start, list) and len(start) == 2 and all(isinstance(x, int) for x in start)):
-            return jsonify({"error": "start must be [row,col] ints"}), 400
-        if not (isinstance(goal, list) and len(goal) == 2 and all(isinstance(x, int) for x in goal)):
-            return jsonify({"error": "goal must be [row,col] ints"}), 400
-
-        grid = Grid(cells)
-        s = (start[0], start[1])
-        g = (goal[0], goal[1])
-
-        if not grid.in_bounds(s) or not grid.in_bounds(g):
-            return jsonify({"error": "start/goal out of bounds"}), 400
-        if not grid.is_walkable(s) or not grid.is_walkable(g):
-            return jsonify({"error": "start/goal must be on walkable cells (0)"}), 400
-
-        t0 = time.perf_counter()
-        path, visited = dijkstra(grid, s, g)
-        ms = (time.perf_counter() - t0) * 1000.0
-
-        return jsonify({
-            "path": [[r, c] for (r, c) in path],
-            "visited": [[r, c] for (r, c) in visited],
-            "found": len(path) > 0,
-            "metrics": {
-                "visited_count": len(visited),
-                "path_length": max(0, len(path) - 1),
-                "runtime_ms": ms,
-            }
-        })
+        results, err = _solve_grid(["dijkstra"])
+        if err:
+            return err
+        return jsonify(results["dijkstra"])
 
     except Exception as e:
         tb = traceback.format_exc()
@@ -81,44 +110,10 @@ def solve_dijkstra():
 @app.post("/solve/astar")
 def solve_astar():
     try:
-        data = request.get_json(silent=True)
-        if not data:
-            return jsonify({"error": "Expected JSON body"}), 400
-
-        cells = data.get("grid")
-        start = data.get("start")
-        goal = data.get("goal")
-
-        if not isinstance(cells, list) or not cells or not all(isinstance(row, list) for row in cells):
-            return jsonify({"error": "grid must be a 2D list"}), 400
-        if not (isinstance(start, list) and len(start) == 2 and all(isinstance(x, int) for x in start)):
-            return jsonify({"error": "start must be [row,col] ints"}), 400
-        if not (isinstance(goal, list) and len(goal) == 2 and all(isinstance(x, int) for x in goal)):
-            return jsonify({"error": "goal must be [row,col] ints"}), 400
-
-        grid = Grid(cells)
-        s = (start[0], start[1])
-        g = (goal[0], goal[1])
-
-        if not grid.in_bounds(s) or not grid.in_bounds(g):
-            return jsonify({"error": "start/goal out of bounds"}), 400
-        if not grid.is_walkable(s) or not grid.is_walkable(g):
-            return jsonify({"error": "start/goal must be on walkable cells (0)"}), 400
-
-        t0 = time.perf_counter()
-        visited, path, found = astar(grid, s, g)
-        ms = (time.perf_counter() - t0) * 1000.0
-
-        return jsonify({
-            "visited": [[r, c] for (r, c) in visited],
-            "path": [[r, c] for (r, c) in path],
-            "found": found,
-            "metrics": {
-                "visited_count": len(visited),
-                "path_length": max(0, len(path) - 1),
-                "runtime_ms": ms,
-            }
-        })
+        results, err = _solve_grid(["astar"])
+        if err:
+            return err
+        return jsonify(results["astar"])
 
     except Exception as e:
         tb = traceback.format_exc()
@@ -129,60 +124,10 @@ def solve_astar():
 @app.post("/solve/compare")
 def solve_compare():
     try:
-        data = request.get_json(silent=True)
-        if not data:
-            return jsonify({"error": "Expected JSON body"}), 400
-
-        cells = data.get("grid")
-        start = data.get("start")
-        goal = data.get("goal")
-
-        if not isinstance(cells, list) or not cells or not all(isinstance(row, list) for row in cells):
-            return jsonify({"error": "grid must be a 2D list"}), 400
-        if not (isinstance(start, list) and len(start) == 2 and all(isinstance(x, int) for x in start)):
-            return jsonify({"error": "start must be [row,col] ints"}), 400
-        if not (isinstance(goal, list) and len(goal) == 2 and all(isinstance(x, int) for x in goal)):
-            return jsonify({"error": "goal must be [row,col] ints"}), 400
-
-        grid = Grid(cells)
-        s = (start[0], start[1])
-        g = (goal[0], goal[1])
-
-        if not grid.in_bounds(s) or not grid.in_bounds(g):
-            return jsonify({"error": "start/goal out of bounds"}), 400
-        if not grid.is_walkable(s) or not grid.is_walkable(g):
-            return jsonify({"error": "start/goal must be on walkable cells (0)"}), 400
-
-        t0 = time.perf_counter()
-        dj_path, dj_visited = dijkstra(grid, s, g)
-        dj_ms = (time.perf_counter() - t0) * 1000.0
-
-        t1 = time.perf_counter()
-        a_visited, a_path, a_found = astar(grid, s, g)
-        a_ms = (time.perf_counter() - t1) * 1000.0
-
-        return jsonify({
-            "dijkstra": {
-                "visited": [[r, c] for (r, c) in dj_visited],
-                "path": [[r, c] for (r, c) in dj_path],
-                "found": len(dj_path) > 0,
-                "metrics": {
-                    "visited_count": len(dj_visited),
-                    "path_length": max(0, len(dj_path) - 1),
-                    "runtime_ms": dj_ms,
-                },
-            },
-            "astar": {
-                "visited": [[r, c] for (r, c) in a_visited],
-                "path": [[r, c] for (r, c) in a_path],
-                "found": a_found,
-                "metrics": {
-                    "visited_count": len(a_visited),
-                    "path_length": max(0, len(a_path) - 1),
-                    "runtime_ms": a_ms,
-                },
-            }
-        })
+        results, err = _solve_grid(["dijkstra", "astar"])
+        if err:
+            return err
+        return jsonify(results)
 
     except Exception as e:
         tb = traceback.format_exc()
@@ -194,26 +139,158 @@ def solve_compare():
 # OSM ROUTING (real-world)
 # ---------------------------
 
+class _BadRequest(ValueError):
+    pass
+
+
+def _tiled_store(tileset):
+    if not isinstance(tileset, str) or not tileset or Path(tileset).name != tileset:
+        raise _BadRequest("tileset must be a tile directory name")
+    if not (TILES_DIR / tileset).is_dir():
+        raise _BadRequest(f"unknown tileset: {tileset}")
+    try:
+        return get_tiled_store(str(TILES_DIR / tileset))
+    except InvalidTileSetError as e:
+        raise _BadRequest(str(e)) from None
+
+
+def _route_osm(data, start, goal, call_key, route):
+    """
+    Runs route(G, start node, goal node) on the graph an OSM request names:
+    a stitched tile corridor when "tileset" is given, else the cached place
+    graph. Identical in-flight requests (same graph, start, goal, call_key)
+    share one run, including tile selection and snapping.
+
+    Admission is per place graph, and per stitched corridor (its tile set)
+    for tilesets, so far-apart regions of one tileset do not share a limit.
+    Returns (result, coalesced, graph meta fields).
+    Raises _BadRequest on bad input and Overloaded when admission is full.
+    """
+    tileset = data.get("tileset")
+    if tileset is not None:
+        store = _tiled_store(tileset)
+
+        def run_tiles():
+            try:
+                (G, s, g, tiles), _shared = _graph_coalescer.run(
+                    ("tiles", store.key, start, goal), lambda: store.route_graph(start[0], start[1], goal[0], goal[1])
+                )
+            except OutsideTilesError as e:
+                raise _BadRequest(str(e)) from None
+            return _route_admission.run((store.key, tiles), lambda: route(G, s, g)), len(tiles)
+
+        (res, tiles_count), coalesced = _route_coalescer.run((store.key, start, goal, call_key), run_tiles)
+        return res, coalesced, {"tileset": tileset, "network": store.network, "tiles_count": tiles_count}
+
+    place = data.get("place", "Delft, Netherlands")
+    network = data.get("network", "drive")
+    if not (isinstance(place, str) and isinstance(network, str)):
+        raise _BadRequest("place and network must be strings")
+    key = graph_key(place, network)
+    G, _shared = _graph_coalescer.run(("place", key), lambda: get_graph(place, network))
+
+    def run_place():
+        s, g = snap_nodes(G, start[0], start[1], goal[0], goal[1])
+        return route(G, s, g)
+
+    res, coalesced = _route_coalescer.run((key, start, goal, call_key), lambda: _route_admission.run(key, run_place))
+    return res, coalesced, {"place": place, "network": network}
+
+
+def _latlon(value):
+    """[lat, lon] as a float tuple (hashable, so it can key coalesced calls), or None."""
+    if not (isinstance(value, list) and len(value) == 2):
+        return None
+    if not all(isinstance(x, (int, float)) and not isinstance(x, bool) for x in value):
+        return None
+    return (float(value[0]), float(value[1]))
+
+
+def _overloaded(e: Overloaded):
+    resp = jsonify({"error": str(e)})
+    resp.headers["Retry-After"] = str(max(1, math.ceil(e.retry_after_s)))
+    return resp, 429
+
+
 @app.post("/osm/route/compare")
 def osm_route_compare():
     try:
         data = request.get_json(silent=True) or {}
-        place = data.get("place", "Delft, Netherlands")
-        network = data.get("network", "drive")
 
-        start = data.get("start")  # [lat, lon]
-        goal = data.get("goal")    # [lat, lon]
-        if not (isinstance(start, list) and len(start) == 2 and isinstance(goal, list) and len(goal) == 2):
+        start = _latlon(data.get("start"))
+        goal = _latlon(data.get("goal"))
+        if start is None or goal is None:
             return jsonify({"error": "Expected start and goal as [lat, lon]"}), 400
+        try:
+            trace_options = parse_trace_options(data)
+        except ValueError as e:
+            return jsonify({"error": str(e)}), 400
+
+        storage = data.get("storage", "dict")
+        if storage not in STORAGE_MODES:
+            return jsonify({"error": f"storage must be one of: {', '.join(STORAGE_MODES)}"}), 400
+
+        try:
+            res, coalesced, graph_meta = _route_osm(
+                data, start, goal, ("compare", trace_options, storage),
+                lambda G, s, g: route_compare_nodes(G, s, g, trace_options, storage),
+            )
+        except _BadRequest as e:
+            return jsonify({"error": str(e)}), 400
+        except Overloaded as e:
+            return _overloaded(e)
+
+        # Merge meta rather than overwrite it (copy: coalesced callers share res)
+        meta = dict(res.get("meta", {}))
+        meta.update(graph_meta)
+        meta["coalesced"] = coalesced
+        res = {**res, "meta": meta}
+
+        return jsonify(res)
+
+    except Exception as e:
+        tb = traceback.format_exc()
+        print(tb, flush=True)
+        return jsonify({"error": str(e), "traceback": tb}), 500
 
-        G = get_graph(place, network)
 
-        res = route_compare_own(G, start[0], start[1], goal[0], goal[1])
+@app.post("/osm/route/alternatives")
+def osm_route_alternatives():
+    try:
+        data = request.get_json(silent=True) or {}
+
+        start = _latlon(data.get("start"))
+        goal = _latlon(data.get("goal"))
+        if start is None or goal is None:
+            return jsonify({"error": "Expected start and goal as [lat, lon]"}), 400
 
-        # Merge meta rather than overwrite it
-        meta = res.get("meta", {})
-        meta.update({"place": place, "network": network})
-        res["meta"] = meta
+        k = data.get("k", 3)
+        method = data.get("method", "plateau")
+        max_stretch = data.get("max_stretch", 0.25)
+        max_overlap = data.get("max_overlap", 0.7)
+        if not (isinstance(k, int) and not isinstance(k, bool) and 1 <= k <= MAX_ALTERNATIVES):
+            return jsonify({"error": f"k must be an int in 1..{MAX_ALTERNATIVES}"}), 400
+        if method not in ALTERNATIVE_METHODS:
+            return jsonify({"error": f"method must be one of: {', '.join(ALTERNATIVE_METHODS)}"}), 400
+        if not (isinstance(max_stretch, (int, float)) and not isinstance(max_stretch, bool) and 0 <= max_stretch <= 2):
+            return jsonify({"error": "max_stretch must be a number in [0, 2]"}), 400
+        if not (isinstance(max_overlap, (int, float)) and not isinstance(max_overlap, bool) and 0 <= max_overlap <= 1):
+            return jsonify({"error": "max_overlap must be a number in [0, 1]"}), 400
+
+        try:
+            res, coalesced, graph_meta = _route_osm(
+                data, start, goal, ("alternatives", k, method, float(max_stretch), float(max_overlap)),
+                lambda G, s, g: route_alternatives_nodes(G, s, g, k, method, float(max_stretch), float(max_overlap)),
+            )
+        except _BadRequest as e:
+            return jsonify({"error": str(e)}), 400
+        except Overloaded as e:
+            return _overloaded(e)
+
+        meta = dict(res.get("meta", {}))
+        meta.update(graph_meta)
+        meta["coalesced"] = coalesced
+        res = {**res, "meta": meta}
 
         return jsonify(res)
 
@@ -0,0 +1,291 @@
+# backend/pathfinding/alternatives.py
+from __future__ import annotations
+
+from array import array
+import heapq
+import time
+from typing import Any, Dict, List, Optional, Set, Tuple
+
+from pathfinding.graph.astar_compact import astar_indices
+from pathfinding.graph.dijkstra_compact import dijkstra_indices
+from pathfinding.osm.compact_graph import CompactGraph
+from pathfinding.osm.graph_adapter import NodeId
+from pathfinding.trace import SearchTrace, TraceLevel, TraceOptions
+from pathfinding.utils import reconstruct_path_indices
+
+ALTERNATIVE_METHODS = ("plateau", "yen")
+
+# Searches here only need their work counted, never recorded
+_COUNTS = TraceOptions(level=TraceLevel.COUNTS)
+
+
+class _Cost:
+    """Search work summed over every search an alternatives query runs."""
+
+    __slots__ = ("searches", "visited", "relaxed")
+
+    def __init__(self):
+        self.searches = 0
+        self.visited = 0
+        self.relaxed = 0
+
+    def trace(self) -> SearchTrace:
+        self.searches += 1
+        return _COUNTS.new_trace()
+
+    def add(self, trace: SearchTrace) -> None:
+        self.visited += trace.visited_count
+        self.relaxed += trace.relaxed_count
+
+    def as_dict(self) -> Dict[str, int]:
+        return {"searches": self.searches, "visited_count": self.visited, "explored_edges_count": self.relaxed}
+
+
+def _astar(
+    cg: CompactGraph,
+    s: int,
+    t: int,
+    cost: _Cost,
+    banned_nodes: Optional[bytearray] = None,
+    banned_from_s: Optional[Set[int]] = None,
+) -> Tuple[float, List[int]]:
+    """astar_indices counted into cost. Returns (distance, path) or (inf, [])."""
+    trace = cost.trace()
+    dist, found, parent = astar_indices(cg, s, t, trace, banned_nodes, banned_from_s)
+    cost.add(trace)
+    if not found:
+        return float("inf"), []
+    return dist, reconstruct_path_indices(parent, s, t)
+
+
+def _tree(
+    offsets: array,
+    targets: array,
+    weights: array,
+    source: int,
+    cost: _Cost,
+    stop_at: int = -1,
+    stretch: Optional[float] = None,
+    limit: float = float("inf"),
+) -> Tuple[array, array]:
+    """
+    Dijkstra shortest-path tree from source (dijkstra_indices counted into
+    cost), settled up to limit, or up to (1 + stretch) * dist[stop_at].
+    Returns (dist, parent) dense arrays.
+    """
+    trace = cost.trace()
+    dist, parent = dijkstra_indices(offsets, targets, weights, source, stop_at, trace, stretch, limit)
+    cost.add(trace)
+    return dist, parent
+
+
+def _path_length(cg: CompactGraph, path: List[int]) -> float:
+    return sum(cg.edge_length(a, b) for a, b in zip(path, path[1:]))
+
+
+def _shared_length(cg: CompactGraph, path: List[int], other_edges: Set[Tuple[int, int]]) -> Tuple[float, float]:
+    """(length of path on edges of another path, total length of path)."""
+    total = 0.0
+    shared = 0.0
+    for a, b in zip(path, path[1:]):
+        w = cg.edge_length(a, b)
+        total += w
+        if (a, b) in other_edges:
+            shared += w
+    return shared, total
+
+
+class _Selector:
+    """
+    Accepts new candidates that respect the stretch limit and share at most
+    max_overlap of their own length, and of each accepted route's length,
+    with any accepted route.
+    """
+
+    def __init__(self, cg: CompactGraph, best: List[int], best_dist: float, max_stretch: float, max_overlap: float):
+        self.cg = cg
+        self.best_dist = best_dist
+        self.max_dist = (1.0 + max_stretch) * best_dist
+        self.max_overlap = max_overlap
+        self.routes: List[Tuple[List[int], float, float]] = [(best, best_dist, 1.0)]
+        self._edge_sets: List[Set[Tuple[int, int]]] = [set(zip(best, best[1:]))]
+        self._seen: Set[Tuple[int, ...]] = {tuple(best)}
+
+    def offer(self, path: List[int], dist: float) -> bool:
+        if dist > self.max_dist or len(set(path)) != len(path):
+            return False
+        # max_overlap = 1 would otherwise let a route through twice
+        key = tuple(path)
+        if key in self._seen:
+            return False
+        overlaps = []
+        for (_other, other_dist, _o), edges in zip(self.routes, self._edge_sets):
+            shared, total = _shared_length(self.cg, path, edges)
+            shortest = min(total, other_dist)
+            if shortest > 0 and shared / shortest > self.max_overlap:
+                return False
+            overlaps.append(shared / total if total > 0 else 1.0)
+        self._seen.add(key)
+        self.routes.append((path, dist, overlaps[0]))
+        self._edge_sets.append(set(zip(path, path[1:])))
+        return True
+
+
+def _yen(cg: CompactGraph, s: int, t: int, k: int, sel: _Selector, cost: _Cost, max_iterations: int) -> None:
+    """
+    Yen's k-shortest loopless paths, generated in length order until k routes
+    pass the selector, the next path exceeds the stretch bound, or
+    max_iterations paths have been examined.
+    """
+    accepted: List[List[int]] = [sel.routes[0][0]]
+    candidates: List[Tuple[float, List[int]]] = []
+    seen = {tuple(accepted[0])}
+    n = len(cg)
+
+    for _ in range(max_iterations):
+        prev = accepted[-1]
+        for i in range(len(prev) - 1):
+            spur = prev[i]
+            root = prev[:i + 1]
+
+            banned_from_spur = {p[i + 1] for p in accepted if len(p) > i + 1 and p[:i + 1] == root}
+            banned_nodes = bytearray(n)
+            for node in root[:-1]:
+                banned_nodes[node] = 1
+
+            d, spur_path = _astar(cg, spur, t, cost, banned_nodes, banned_from_spur)
+            if not spur_path:
+                continue
+            path = root[:-1] + spur_path
+            key = tuple(path)
+            if key in seen:
+                continue
+            seen.add(key)
+            heapq.heappush(candidates, (_path_length(cg, root) + d, path))
+
+        if not candidates:
+            return
+        dist, path = heapq.heappop(candidates)
+        if dist > sel.max_dist:
+            return
+        accepted.append(path)
+        sel.offer(path, dist)
+        if len(sel.routes) >= k:
+            return
+
+
+def _plateau(cg: CompactGraph, s: int, t: int, k: int, sel: _Selector, cost: _Cost, max_stretch: float) -> None:
+    """
+    Plateau method: grow a forward tree from s and a backward tree into t, both
+    bounded by the stretch limit. Chains of edges that lie on both trees
+    (plateaus) give via-routes s -> a ~> b -> t; longer plateaus are tried first.
+    """
+    n = len(cg)
+    dist_f, parent_f = _tree(cg.offsets, cg.targets, cg.weights, s, cost, stop_at=t, stretch=max_stretch)
+    if dist_f[t] == float("inf"):
+        return
+    r_offsets, r_sources, r_weights = cg.reverse()
+    limit = (1.0 + max_stretch) * dist_f[t]
+    dist_b, parent_b = _tree(r_offsets, r_sources, r_weights, t, cost, limit=limit)
+
+    # plateau edge u -> v: forward tree reaches v via u, backward tree leaves u via v
+    nxt: Dict[int, int] = {}
+    has_prev: Set[int] = set()
+    for v in range(n):
+        u = parent_f[v]
+        if u >= 0 and parent_b[u] == v:
+            nxt[u] = v
+            has_prev.add(v)
+
+    plateaus: List[Tuple[float, int, int]] = []
+    for a in nxt:
+        if a in has_prev:
+            continue
+        b = a
+        while b in nxt:
+            b = nxt[b]
+        plateaus.append((dist_f[b] - dist_f[a], a, b))
+    plateaus.sort(key=lambda p: -p[0])
+
+    for _plen, a, b in plateaus:
+        total = dist_f[b] + dist_b[b]
+        if total > sel.max_dist:
+            continue
+        head = reconstruct_path_indices(parent_f, s, b)
+        tail = [b]
+        while tail[-1] != t:
+            tail.append(parent_b[tail[-1]])
+        sel.offer(head + tail[1:], total)
+        if len(sel.routes) >= k:
+            return
+
+
+def alternative_routes(
+    cg: CompactGraph,
+    start: NodeId,
+    goal: NodeId,
+    k: int = 3,
+    method: str = "plateau",
+    max_stretch: float = 0.25,
+    max_overlap: float = 0.7,
+    max_iterations: int = 20,
+) -> Dict[str, Any]:
+    """
+    Up to k routes start -> goal: the shortest one plus alternatives that are
+    at most (1 + max_stretch) times as long and share at most max_overlap of
+    their length with any other returned route.
+
+    method = "plateau" (two bounded trees, fast) or "yen" (k-shortest loopless
+    paths with A* spur searches, max_iterations paths examined).
+
+    Returns {"routes": [{nodes, distance_m, stretch, overlap}], "cost": {...}}
+    with routes ordered by distance (shortest first); overlap is the share of
+    a route's length on the shortest route. cost compares the total search
+    work with a single A* query.
+    """
+    if method not in ALTERNATIVE_METHODS:
+        raise ValueError(f"method must be one of: {', '.join(ALTERNATIVE_METHODS)}")
+
+    s = cg.idx(start)
+    t = cg.idx(goal)
+
+    # Baseline: the single shortest-path query (also Yen's first path)
+    single = _Cost()
+    t0 = time.perf_counter()
+    best_dist, best = _astar(cg, s, t, single)
+    single_ms = (time.perf_counter() - t0) * 1000.0
+
+    cost = _Cost()
+    t1 = time.perf_counter()
+    if best:
+        sel = _Selector(cg, best, best_dist, max_stretch, max_overlap)
+        if k > 1:
+            if method == "yen":
+                _yen(cg, s, t, k, sel, cost, max_iterations)
+            else:
+                _plateau(cg, s, t, k, sel, cost, max_stretch)
+        # plateaus are tried longest-plateau first, not in distance order
+        routes = sel.routes[:1] + sorted(sel.routes[1:], key=lambda r: r[1])
+    else:
+        routes = []
+    extra_ms = (time.perf_counter() - t1) * 1000.0
+
+    total_relaxed = single.relaxed + cost.relaxed
+    return {
+        "routes": [
+            {
+                "nodes": cg.to_node_ids(path),
+                "distance_m": float(dist),
+                "stretch": float(dist / best_dist) if best_dist > 0 else 1.0,
+                "overlap": float(overlap),
+            }
+            for path, dist, overlap in routes
+        ],
+        "cost": {
+            "method": method,
+            "single_query": {**single.as_dict(), "runtime_ms": single_ms},
+            "alternatives": {**cost.as_dict(), "runtime_ms": extra_ms},
+            "relative_explored_edges": float(total_relaxed / single.relaxed) if single.relaxed else None,
+            "relative_runtime": float((single_ms + extra_ms) / single_ms) if single_ms > 0 else None,
+        },
+    }
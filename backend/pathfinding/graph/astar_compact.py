@@ -0,0 +1,134 @@
+# backend/pathfinding/astar_compact.py
+from __future__ import annotations
+
+from array import array
+import heapq
+from typing import List, Optional, Set, Tuple
+
+from pathfinding.osm.compact_graph import CompactGraph
+from pathfinding.osm.graph_adapter import NodeId
+from pathfinding.trace import FULL_TRACE, SearchTrace
+from pathfinding.utils import container_bytes, heap_peak_bytes, reconstruct_path_indices
+
+
+def astar_compact(
+    cg: CompactGraph,
+    start: NodeId,
+    goal: NodeId,
+    trace: Optional[SearchTrace] = None,
+) -> Tuple[
+    List[NodeId],                 # path_nodes
+    List[NodeId],                 # visited_order
+    float,                        # distance_m
+    bool,                         # found
+    array,                        # parent (int32, dense indices, -1 = none)
+    List[Tuple[NodeId, NodeId]]   # explored_edges
+]:
+    """
+    astar_graph over a CompactGraph with dense per-query state
+    (see dijkstra_compact for the storage layout and return shape).
+    """
+    if trace is None:
+        trace = FULL_TRACE.new_trace()
+
+    if start == goal:
+        if trace.on_visit is not None:
+            trace.on_visit(cg.idx(start))
+        trace.finish(1, 0)
+        return [start], cg.to_node_ids(trace.visited_order), 0.0, True, array("i"), []
+
+    s = cg.idx(start)
+    t = cg.idx(goal)
+    distance_m, found, parent = astar_indices(cg, s, t, trace)
+
+    path_nodes = cg.to_node_ids(reconstruct_path_indices(parent, s, t)) if found else []
+
+    ids = cg.node_ids
+    explored_edges = [(int(ids[u]), int(ids[v])) for u, v in trace.explored_edges]
+    return path_nodes, cg.to_node_ids(trace.visited_order), distance_m, found, parent, explored_edges
+
+
+def astar_indices(
+    cg: CompactGraph,
+    s: int,
+    t: int,
+    trace: SearchTrace,
+    banned_nodes: Optional[bytearray] = None,
+    banned_from_s: Optional[Set[int]] = None,
+) -> Tuple[float, bool, array]:
+    """
+    The astar_compact search on dense indices. Nodes flagged in banned_nodes
+    (one byte per node) and the out-edges s -> v for v in banned_from_s are
+    skipped, as Yen's spur searches need. Returns (distance_m, found, parent).
+    """
+    on_visit = trace.on_visit
+    on_relax = trace.on_relax
+    counting = trace.counting
+    visited_count = 0
+    relaxed_count = 0
+    heap_peak = 1
+
+    n = len(cg)
+    offsets = cg.offsets
+    targets = cg.targets
+    weights = cg.weights
+    heuristic_m = cg.heuristic_m
+
+    inf = float("inf")
+    g_score = array("d", [inf]) * n
+    parent = array("i", [-1]) * n
+    settled = bytearray((n + 7) >> 3)
+    g_score[s] = 0.0
+
+    # heap items: (f, g, node)
+    open_heap: List[Tuple[float, float, int]] = [(heuristic_m(s, t), 0.0, s)]
+
+    distance_m = inf
+    found = False
+
+    while open_heap:
+        f, g, u = heapq.heappop(open_heap)
+
+        # Skip stale heap entries: only process if this is the current best g for u
+        if g != g_score[u]:
+            continue
+
+        byte = u >> 3
+        bit = 1 << (u & 7)
+        if not settled[byte] & bit:
+            settled[byte] |= bit
+            if counting:
+                visited_count += 1
+            if on_visit is not None:
+                on_visit(u)
+
+        if u == t:
+            distance_m = g
+            found = True
+            break
+
+        excluded = banned_from_s if u == s else None
+        for e in range(offsets[u], offsets[u + 1]):
+            v = targets[e]
+            if banned_nodes is not None and banned_nodes[v]:
+                continue
+            if excluded and v in excluded:
+                continue
+            tentative_g = g + weights[e]
+            if tentative_g < g_score[v]:
+                parent[v] = u
+                g_score[v] = tentative_g
+                if counting:
+                    relaxed_count += 1
+                if on_relax is not None:
+                    on_relax((u, v))
+                heapq.heappush(open_heap, (tentative_g + heuristic_m(v, t), tentative_g, v))
+
+        if counting and len(open_heap) > heap_peak:
+            heap_peak = len(open_heap)
+
+    if counting:
+        peak_bytes = container_bytes(g_score, parent, settled) + heap_peak_bytes(heap_peak, (0.0, 0.0, s))
+        trace.finish(visited_count, relaxed_count, peak_bytes)
+
+    return distance_m, found, parent
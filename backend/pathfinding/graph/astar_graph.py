@@ -2,16 +2,18 @@
 from __future__ import annotations
 
 import heapq
-from typing import Dict, List, Tuple
+from typing import Dict, List, Optional, Tuple
 
 from pathfinding.osm.graph_adapter import OSMGraphAdapter, NodeId
-from pathfinding.utils import reconstruct_path_nodes
+from pathfinding.trace import FULL_TRACE, SearchTrace
+from pathfinding.utils import container_bytes, heap_peak_bytes, reconstruct_path_nodes
 
 
 def astar_graph(
     adapter: OSMGraphAdapter,
     start: NodeId,
-    goal: NodeId
+    goal: NodeId,
+    trace: Optional[SearchTrace] = None,
 ) -> Tuple[
     List[NodeId],                 # path_nodes
     List[NodeId],                 # visited_order
@@ -26,9 +28,24 @@ def astar_graph(
 
     visited_order  = nodes expanded (no duplicates)
     explored_edges = list of (u, v) edges that improved g_score[v] (relaxations)
+
+    trace works as in dijkstra_graph (default: full trace).
     """
+    if trace is None:
+        trace = FULL_TRACE.new_trace()
+
     if start == goal:
-        return [start], [start], 0.0, True, {}, []
+        if trace.on_visit is not None:
+            trace.on_visit(start)
+        trace.finish(1, 0)
+        return [start], trace.visited_order, 0.0, True, {}, trace.explored_edges
+
+    on_visit = trace.on_visit
+    on_relax = trace.on_relax
+    counting = trace.counting
+    visited_count = 0
+    relaxed_count = 0
+    heap_peak = 1
 
     # heap items: (f, g, node)
     open_heap: List[Tuple[float, float, NodeId]] = []
@@ -36,9 +53,7 @@ def astar_graph(
 
     g_score: Dict[NodeId, float] = {start: 0.0}
     came_from: Dict[NodeId, NodeId] = {}
-    explored_edges: List[Tuple[NodeId, NodeId]] = []
 
-    visited_order: List[NodeId] = []
     visited_set = set()
 
     while open_heap:
@@ -50,21 +65,36 @@ def astar_graph(
 
         if u not in visited_set:
             visited_set.add(u)
-            visited_order.append(u)
+            if counting:
+                visited_count += 1
+            if on_visit is not None:
+                on_visit(u)
 
         if u == goal:
+            if counting:
+                peak_bytes = container_bytes(g_score, came_from, visited_set) + heap_peak_bytes(heap_peak, (0.0, 0.0, start))
+                trace.finish(visited_count, relaxed_count, peak_bytes)
             path_nodes = reconstruct_path_nodes(came_from, start, goal)
-            return path_nodes, visited_order, g, True, came_from, explored_edges
+            return path_nodes, trace.visited_order, g, True, came_from, trace.explored_edges
 
         for v, cost in adapter.neighbors(u):
             tentative_g = g + cost
             if tentative_g < g_score.get(v, float("inf")):
                 came_from[v] = u
                 g_score[v] = tentative_g
-                explored_edges.append((u, v))
+                if counting:
+                    relaxed_count += 1
+                if on_relax is not None:
+                    on_relax((u, v))
 
                 h = adapter.heuristic_m(v, goal)
                 nxt_f = tentative_g + h
                 heapq.heappush(open_heap, (float(nxt_f), float(tentative_g), v))
 
-    return [], visited_order, float("inf"), False, came_from, explored_edges
\ No newline at end of file
+        if counting and len(open_heap) > heap_peak:
+            heap_peak = len(open_heap)
+
+    if counting:
+        peak_bytes = container_bytes(g_score, came_from, visited_set) + heap_peak_bytes(heap_peak, (0.0, 0.0, start))
+        trace.finish(visited_count, relaxed_count, peak_bytes)
+    return [], trace.visited_order, float("inf"), False, came_from, trace.explored_edges
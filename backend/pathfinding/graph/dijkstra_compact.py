@@ -0,0 +1,134 @@
+# backend/pathfinding/dijkstra_compact.py
+from __future__ import annotations
+
+from array import array
+import heapq
+from typing import List, Optional, Tuple
+
+from pathfinding.osm.compact_graph import CompactGraph
+from pathfinding.osm.graph_adapter import NodeId
+from pathfinding.trace import FULL_TRACE, SearchTrace
+from pathfinding.utils import container_bytes, heap_peak_bytes, reconstruct_path_indices
+
+
+def dijkstra_compact(
+    cg: CompactGraph,
+    start: NodeId,
+    goal: NodeId,
+    trace: Optional[SearchTrace] = None,
+) -> Tuple[
+    List[NodeId],                 # path_nodes
+    List[NodeId],                 # visited_order
+    float,                        # distance_m
+    bool,                         # found
+    array,                        # parent (int32, dense indices, -1 = none)
+    List[Tuple[NodeId, NodeId]]   # explored_edges
+]:
+    """
+    dijkstra_graph over a CompactGraph with dense per-query state:
+      dist    = float64 array, parent = int32 array, settled = bitset
+
+    Same return shape as dijkstra_graph, except came_from is the dense parent
+    array. The search and trace work on dense indices; path, visited_order and
+    explored_edges are mapped back to OSM IDs once at the end.
+    """
+    if trace is None:
+        trace = FULL_TRACE.new_trace()
+
+    if start == goal:
+        if trace.on_visit is not None:
+            trace.on_visit(cg.idx(start))
+        trace.finish(1, 0)
+        return [start], cg.to_node_ids(trace.visited_order), 0.0, True, array("i"), []
+
+    s = cg.idx(start)
+    t = cg.idx(goal)
+    dist, parent = dijkstra_indices(cg.offsets, cg.targets, cg.weights, s, t, trace)
+
+    distance_m = dist[t]
+    found = distance_m != float("inf")
+    path_nodes = cg.to_node_ids(reconstruct_path_indices(parent, s, t))
+
+    ids = cg.node_ids
+    explored_edges = [(int(ids[u]), int(ids[v])) for u, v in trace.explored_edges]
+    return path_nodes, cg.to_node_ids(trace.visited_order), distance_m, found, parent, explored_edges
+
+
+def dijkstra_indices(
+    offsets: array,
+    targets: array,
+    weights: array,
+    s: int,
+    t: int,
+    trace: SearchTrace,
+    stretch: Optional[float] = None,
+    limit: float = float("inf"),
+) -> Tuple[array, array]:
+    """
+    The dijkstra_compact search on dense indices over any CSR (forward or
+    cg.reverse()). Returns the dense (dist, parent) arrays.
+
+    Stops when t is settled, or with stretch set keeps growing the tree up to
+    (1 + stretch) * dist[t]. Nodes farther than limit are never settled, so
+    t = -1 with a finite limit gives a bounded shortest-path tree.
+    """
+    on_visit = trace.on_visit
+    on_relax = trace.on_relax
+    counting = trace.counting
+    visited_count = 0
+    relaxed_count = 0
+    heap_peak = 1
+
+    n = len(offsets) - 1
+    inf = float("inf")
+    dist = array("d", [inf]) * n
+    parent = array("i", [-1]) * n
+    settled = bytearray((n + 7) >> 3)
+    dist[s] = 0.0
+
+    pq: List[Tuple[float, int]] = [(0.0, s)]
+
+    while pq:
+        current_dist, u = heapq.heappop(pq)
+
+        # Skip stale heap entries (avoid float equality traps)
+        if current_dist > dist[u]:
+            continue
+        if current_dist > limit:
+            break
+
+        byte = u >> 3
+        bit = 1 << (u & 7)
+        if settled[byte] & bit:
+            continue
+        settled[byte] |= bit
+        if counting:
+            visited_count += 1
+        if on_visit is not None:
+            on_visit(u)
+
+        if u == t:
+            if stretch is None:
+                break
+            limit = (1.0 + stretch) * current_dist
+
+        for e in range(offsets[u], offsets[u + 1]):
+            v = targets[e]
+            new_dist = current_dist + weights[e]
+            if new_dist < dist[v]:
+                dist[v] = new_dist
+                parent[v] = u
+                if counting:
+                    relaxed_count += 1
+                if on_relax is not None:
+                    on_relax((u, v))
+                heapq.heappush(pq, (new_dist, v))
+
+        if counting and len(pq) > heap_peak:
+            heap_peak = len(pq)
+
+    if counting:
+        peak_bytes = container_bytes(dist, parent, settled) + heap_peak_bytes(heap_peak, (0.0, s))
+        trace.finish(visited_count, relaxed_count, peak_bytes)
+
+    return dist, parent
@@ -2,16 +2,18 @@
 from __future__ import annotations
 
 import heapq
-from typing import Dict, List, Tuple
+from typing import Dict, List, Optional, Tuple
 
 from pathfinding.osm.graph_adapter import OSMGraphAdapter, NodeId
-from pathfinding.utils import reconstruct_path_nodes
+from pathfinding.trace import FULL_TRACE, SearchTrace
+from pathfinding.utils import container_bytes, heap_peak_bytes, reconstruct_path_nodes
 
 
 def dijkstra_graph(
     adapter: OSMGraphAdapter,
     start: NodeId,
-    goal: NodeId
+    goal: NodeId,
+    trace: Optional[SearchTrace] = None,
 ) -> Tuple[
     List[NodeId],                 # path_nodes
     List[NodeId],                 # visited_order
@@ -26,14 +28,29 @@ def dijkstra_graph(
 
     visited_order  = nodes finalized/popped (no duplicates)
     explored_edges = list of (u, v) edges that improved dist[v] (relaxations)
+
+    trace controls what gets recorded (default: full trace). visited_order and
+    explored_edges come from the trace, so they are empty/sampled below "full";
+    counts (and approximate peak search memory) are left on the trace.
     """
+    if trace is None:
+        trace = FULL_TRACE.new_trace()
+
     if start == goal:
-        return [start], [start], 0.0, True, {}, []
+        if trace.on_visit is not None:
+            trace.on_visit(start)
+        trace.finish(1, 0)
+        return [start], trace.visited_order, 0.0, True, {}, trace.explored_edges
+
+    on_visit = trace.on_visit
+    on_relax = trace.on_relax
+    counting = trace.counting
+    visited_count = 0
+    relaxed_count = 0
+    heap_peak = 1
 
     dist: Dict[NodeId, float] = {start: 0.0}
     came_from: Dict[NodeId, NodeId] = {}
-    visited_order: List[NodeId] = []
-    explored_edges: List[Tuple[NodeId, NodeId]] = []
 
     pq: List[Tuple[float, NodeId]] = []
     heapq.heappush(pq, (0.0, start))
@@ -50,7 +67,10 @@ def dijkstra_graph(
         if u in visited_set:
             continue
         visited_set.add(u)
-        visited_order.append(u)
+        if counting:
+            visited_count += 1
+        if on_visit is not None:
+            on_visit(u)
 
         if u == goal:
             break
@@ -60,11 +80,21 @@ def dijkstra_graph(
             if new_dist < dist.get(v, float("inf")):
                 dist[v] = new_dist
                 came_from[v] = u
-                explored_edges.append((u, v))
+                if counting:
+                    relaxed_count += 1
+                if on_relax is not None:
+                    on_relax((u, v))
                 heapq.heappush(pq, (float(new_dist), v))
 
+        if counting and len(pq) > heap_peak:
+            heap_peak = len(pq)
+
+    if counting:
+        peak_bytes = container_bytes(dist, came_from, visited_set) + heap_peak_bytes(heap_peak, (0.0, start))
+        trace.finish(visited_count, relaxed_count, peak_bytes)
+
     distance_m = dist.get(goal, float("inf"))
     found = distance_m != float("inf")
     path_nodes = reconstruct_path_nodes(came_from, start, goal)
 
-    return path_nodes, visited_order, distance_m, found, came_from, explored_edges
\ No newline at end of file
+    return path_nodes, trace.visited_order, distance_m, found, came_from, trace.explored_edges
@@ -0,0 +1,276 @@
+# backend/pathfinding/kernels.py
+from __future__ import annotations
+
+from typing import List, Optional, Tuple
+
+from pathfinding.osm.compact_graph import CompactGraph, EARTH_RADIUS_M
+from pathfinding.osm.graph_adapter import NodeId
+from pathfinding.graph.dijkstra_compact import dijkstra_compact
+from pathfinding.graph.astar_compact import astar_compact
+from pathfinding.trace import FULL_TRACE, SearchTrace, TraceLevel
+from pathfinding.utils import reconstruct_path_indices
+
+# Optional: numba JIT-compiles the kernels below. Without it the public
+# functions fall back to the pure-Python compact searches.
+try:
+    import numpy as np
+    from numba import njit
+    HAVE_NUMBA = True
+except ImportError:  # pragma: no cover - depends on environment
+    np = None
+    HAVE_NUMBA = False
+
+    def njit(*args, **kwargs):
+        if args and callable(args[0]):
+            return args[0]
+        return lambda fn: fn
+
+
+# ---------------------------
+# Kernels (numba nopython)
+# ---------------------------
+#
+# Heap entries live in three parallel arrays (key, g, node) and compare like
+# the Python tuples (f, g, node), so pop order - and with it visited order -
+# matches dijkstra_compact / astar_compact exactly.
+
+@njit(cache=True)
+def _less(hkey, hg, hnode, i, j):
+    if hkey[i] != hkey[j]:
+        return hkey[i] < hkey[j]
+    if hg[i] != hg[j]:
+        return hg[i] < hg[j]
+    return hnode[i] < hnode[j]
+
+
+@njit(cache=True)
+def _swap(hkey, hg, hnode, i, j):
+    hkey[i], hkey[j] = hkey[j], hkey[i]
+    hg[i], hg[j] = hg[j], hg[i]
+    hnode[i], hnode[j] = hnode[j], hnode[i]
+
+
+@njit(cache=True)
+def _sift_up(hkey, hg, hnode, i):
+    while i > 0:
+        p = (i - 1) >> 1
+        if not _less(hkey, hg, hnode, i, p):
+            break
+        _swap(hkey, hg, hnode, i, p)
+        i = p
+
+
+@njit(cache=True)
+def _sift_down(hkey, hg, hnode, size):
+    i = 0
+    while True:
+        l = 2 * i + 1
+        if l >= size:
+            break
+        m = l
+        r = l + 1
+        if r < size and _less(hkey, hg, hnode, r, l):
+            m = r
+        if not _less(hkey, hg, hnode, m, i):
+            break
+        _swap(hkey, hg, hnode, i, m)
+        i = m
+
+
+@njit(cache=True)
+def _grow(a):
+    # numba specializes this per dtype (float64 keys, int32 nodes/buffers)
+    b = np.empty(a.shape[0] * 2, dtype=a.dtype)
+    b[:a.shape[0]] = a
+    return b
+
+
+@njit(cache=True)
+def _haversine(lat_rad, lon_rad, i, j, radius):
+    lat1 = lat_rad[i]
+    lat2 = lat_rad[j]
+    dlat = lat2 - lat1
+    dlon = lon_rad[j] - lon_rad[i]
+    h = np.sin(dlat * 0.5) ** 2 + np.cos(lat1) * np.cos(lat2) * np.sin(dlon * 0.5) ** 2
+    return 2.0 * radius * np.arcsin(min(1.0, np.sqrt(h)))
+
+
+@njit(cache=True)
+def _search_kernel(offsets, targets, weights, lat_rad, lon_rad, s, t, use_heuristic, record):
+    """
+    Dijkstra (use_heuristic=False) or A* (True) from s to t over CSR arrays.
+
+    record=True writes visited nodes and relaxed edges into preallocated
+    buffers (grown by doubling if A* reopens nodes). Returns
+    (distance, found, parent, visited_buf, n_visited, eu_buf, ev_buf, n_relaxed, heap_peak).
+    """
+    n = offsets.shape[0] - 1
+    m = targets.shape[0]
+    inf = np.inf
+
+    g_score = np.full(n, inf)
+    parent = np.full(n, -1, dtype=np.int32)
+    settled = np.zeros(n, dtype=np.uint8)
+
+    cap = m + 1
+    hkey = np.empty(cap, dtype=np.float64)
+    hg = np.empty(cap, dtype=np.float64)
+    hnode = np.empty(cap, dtype=np.int32)
+
+    vcap = n if record else 1
+    ecap = (m if m > 0 else 1) if record else 1
+    visited_buf = np.empty(vcap, dtype=np.int32)
+    eu_buf = np.empty(ecap, dtype=np.int32)
+    ev_buf = np.empty(ecap, dtype=np.int32)
+    n_visited = 0
+    n_relaxed = 0
+
+    g_score[s] = 0.0
+    h0 = _haversine(lat_rad, lon_rad, s, t, EARTH_RADIUS_M) if use_heuristic else 0.0
+    hkey[0] = h0
+    hg[0] = 0.0
+    hnode[0] = s
+    size = 1
+    heap_peak = 1
+
+    distance = inf
+    found = False
+
+    while size > 0:
+        key = hkey[0]
+        g = hg[0]
+        u = hnode[0]
+        size -= 1
+        if size > 0:
+            hkey[0] = hkey[size]
+            hg[0] = hg[size]
+            hnode[0] = hnode[size]
+            _sift_down(hkey, hg, hnode, size)
+
+        # Stale entry: Dijkstra skips worse distances and settled nodes,
+        # A* processes only the current best g (like astar_graph)
+        if use_heuristic:
+            if g != g_score[u]:
+                continue
+        else:
+            if g > g_score[u] or settled[u]:
+                continue
+
+        if not settled[u]:
+            settled[u] = 1
+            if record:
+                visited_buf[n_visited] = u
+            n_visited += 1
+
+        if u == t:
+            distance = g
+            found = True
+            break
+
+        for e in range(offsets[u], offsets[u + 1]):
+            v = targets[e]
+            ng = g + weights[e]
+            if ng < g_score[v]:
+                g_score[v] = ng
+                parent[v] = u
+                if record:
+                    if n_relaxed == eu_buf.shape[0]:
+                        eu_buf = _grow(eu_buf)
+                        ev_buf = _grow(ev_buf)
+                    eu_buf[n_relaxed] = u
+                    ev_buf[n_relaxed] = v
+                n_relaxed += 1
+
+                if size == hkey.shape[0]:
+                    hkey = _grow(hkey)
+                    hg = _grow(hg)
+                    hnode = _grow(hnode)
+                if use_heuristic:
+                    hkey[size] = ng + _haversine(lat_rad, lon_rad, v, t, EARTH_RADIUS_M)
+                else:
+                    hkey[size] = ng
+                hg[size] = ng
+                hnode[size] = v
+                _sift_up(hkey, hg, hnode, size)
+                size += 1
+
+        if size > heap_peak:
+            heap_peak = size
+
+    return distance, found, parent, visited_buf, n_visited, eu_buf, ev_buf, n_relaxed, heap_peak
+
+
+# ---------------------------
+# Public API
+# ---------------------------
+
+def _csr_views(cg: CompactGraph):
+    # Zero-copy NumPy views over the CompactGraph's array.array buffers
+    return (
+        np.frombuffer(cg.offsets, dtype=np.int32),
+        np.frombuffer(cg.targets, dtype=np.int32),
+        np.frombuffer(cg.weights, dtype=np.float64),
+        np.frombuffer(cg.lat_rad, dtype=np.float64),
+        np.frombuffer(cg.lon_rad, dtype=np.float64),
+    )
+
+
+def _run(cg: CompactGraph, start: NodeId, goal: NodeId, trace: SearchTrace, use_heuristic: bool):
+    if start == goal:
+        if trace.on_visit is not None:
+            trace.on_visit(cg.idx(start))
+        trace.finish(1, 0)
+        return [start], cg.to_node_ids(trace.visited_order), 0.0, True, np.empty(0, dtype=np.int32), []
+
+    s = cg.idx(start)
+    t = cg.idx(goal)
+    record = trace.on_visit is not None
+    offsets, targets, weights, lat_rad, lon_rad = _csr_views(cg)
+
+    distance, found, parent, vbuf, n_visited, eu, ev, n_relaxed, heap_peak = _search_kernel(
+        offsets, targets, weights, lat_rad, lon_rad, s, t, use_heuristic, record
+    )
+
+    ids = cg.node_ids
+    visited_order: List[NodeId] = []
+    explored_edges: List[Tuple[NodeId, NodeId]] = []
+    if trace.level is TraceLevel.FULL:
+        visited_order = cg.to_node_ids(vbuf[:n_visited].tolist())
+        explored_edges = [(int(ids[u]), int(ids[v])) for u, v in zip(eu[:n_relaxed].tolist(), ev[:n_relaxed].tolist())]
+    elif record:
+        # sampled: feed the kernel's buffers through the trace's sampler
+        for u in vbuf[:n_visited].tolist():
+            trace.on_visit(u)
+        for u, v in zip(eu[:n_relaxed].tolist(), ev[:n_relaxed].tolist()):
+            trace.on_relax((u, v))
+        visited_order = cg.to_node_ids(trace.visited_order)
+        explored_edges = [(int(ids[u]), int(ids[v])) for u, v in trace.explored_edges]
+
+    if trace.counting:
+        # search state only, as container_bytes: g, parent, settled + heap entries at peak
+        peak_bytes = len(cg) * (8 + 4 + 1) + heap_peak * (8 + 8 + 4)
+        trace.finish(n_visited, n_relaxed, peak_bytes)
+
+    path_nodes = cg.to_node_ids(reconstruct_path_indices(parent, s, t)) if found else []
+    return path_nodes, visited_order, float(distance), bool(found), parent, explored_edges
+
+
+def dijkstra_kernel(cg: CompactGraph, start: NodeId, goal: NodeId, trace: Optional[SearchTrace] = None):
+    """
+    dijkstra_compact, compiled with numba when available (same return shape;
+    parent is an int32 NumPy array). Falls back to dijkstra_compact otherwise.
+    """
+    if trace is None:
+        trace = FULL_TRACE.new_trace()
+    if not HAVE_NUMBA:
+        return dijkstra_compact(cg, start, goal, trace)
+    return _run(cg, start, goal, trace, use_heuristic=False)
+
+
+def astar_kernel(cg: CompactGraph, start: NodeId, goal: NodeId, trace: Optional[SearchTrace] = None):
+    """astar_compact, compiled with numba when available (see dijkstra_kernel)."""
+    if trace is None:
+        trace = FULL_TRACE.new_trace()
+    if not HAVE_NUMBA:
+        return astar_compact(cg, start, goal, trace)
+    return _run(cg, start, goal, trace, use_heuristic=True)
@@ -1,9 +1,10 @@
 from __future__ import annotations
 
 import heapq
-from typing import Dict, List, Tuple
+from typing import Dict, List, Optional, Tuple
 
 from .grid import Grid, Coord
+from pathfinding.trace import FULL_TRACE, SearchTrace
 
 
 def manhattan(a: Coord, b: Coord) -> int:
@@ -24,7 +25,7 @@ def reconstruct_path(came_from: Dict[Coord, Coord], start: Coord, goal: Coord) -
     return path
 
 
-def astar(grid: Grid, start: Coord, goal: Coord):
+def astar(grid: Grid, start: Coord, goal: Coord, trace: Optional[SearchTrace] = None):
     """
     A* on a 4-neighbor grid with unit costs.
 
@@ -32,9 +33,23 @@ def astar(grid: Grid, start: Coord, goal: Coord):
       visited_order: nodes expanded (no duplicates, skips stale PQ entries)
       path: list of coords from start..goal (inclusive) or [] if not found
       found: bool
+
+    trace controls what gets recorded (default: full trace); visited_order comes
+    from the trace and the expansion count is left on trace.visited_count.
     """
+    if trace is None:
+        trace = FULL_TRACE.new_trace()
+
     if start == goal:
-        return [start], [start], True
+        if trace.on_visit is not None:
+            trace.on_visit(start)
+        trace.finish(1, 0)
+        return trace.visited_order, [start], True
+
+    on_visit = trace.on_visit
+    counting = trace.counting
+    visited_count = 0
+    relaxed_count = 0
 
     # Heap item: (f, g, coord)
     open_heap: List[Tuple[float, float, Coord]] = []
@@ -47,7 +62,6 @@ def astar(grid: Grid, start: Coord, goal: Coord):
     # Used to skip stale heap entries
     best_f: Dict[Coord, float] = {start: start_f}
 
-    visited_order: List[Coord] = []
     visited_set = set()
 
     while open_heap:
@@ -59,11 +73,15 @@ def astar(grid: Grid, start: Coord, goal: Coord):
 
         if cur not in visited_set:
             visited_set.add(cur)
-            visited_order.append(cur)
+            if counting:
+                visited_count += 1
+            if on_visit is not None:
+                on_visit(cur)
 
         if cur == goal:
+            trace.finish(visited_count, relaxed_count)
             path = reconstruct_path(came_from, start, goal)
-            return visited_order, path, True
+            return trace.visited_order, path, True
 
         for nxt in grid.neighbors(cur):
             tentative_g = g + 1.0  # unit step
@@ -71,6 +89,8 @@ def astar(grid: Grid, start: Coord, goal: Coord):
             if tentative_g < g_score.get(nxt, float("inf")):
                 came_from[nxt] = cur
                 g_score[nxt] = tentative_g
+                if counting:
+                    relaxed_count += 1
 
                 nxt_f = tentative_g + manhattan(nxt, goal)
 
@@ -79,4 +99,5 @@ def astar(grid: Grid, start: Coord, goal: Coord):
                     best_f[nxt] = float(nxt_f)
                     heapq.heappush(open_heap, (float(nxt_f), float(tentative_g), nxt))
 
-    return visited_order, [], False
\ No newline at end of file
+    trace.finish(visited_count, relaxed_count)
+    return trace.visited_order, [], False
\ No newline at end of file
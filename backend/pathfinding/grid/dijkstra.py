@@ -1,7 +1,8 @@
-from typing import List, Tuple, Dict
+from typing import List, Tuple, Dict, Optional
 import heapq
 
 from .grid import Grid
+from pathfinding.trace import FULL_TRACE, SearchTrace
 
 Coord = Tuple[int, int]
 
@@ -23,10 +24,22 @@ def reconstruct_path(came_from: Dict[Coord, Coord], start: Coord, goal: Coord) -
     return path
 
 
-def dijkstra(grid: Grid, start: Coord, goal: Coord):
+def dijkstra(grid: Grid, start: Coord, goal: Coord, trace: Optional[SearchTrace] = None):
+    """
+    Returns: (path, visited_order)
+
+    trace controls what gets recorded (default: full trace); visited_order comes
+    from the trace and the expansion count is left on trace.visited_count.
+    """
+    if trace is None:
+        trace = FULL_TRACE.new_trace()
+    on_visit = trace.on_visit
+    counting = trace.counting
+    visited_count = 0
+    relaxed_count = 0
+
     dist: Dict[Coord, int] = {start: 0}
     came_from: Dict[Coord, Coord] = {}
-    visited_order: List[Coord] = []
 
     pq: List[Tuple[int, Coord]] = []
     heapq.heappush(pq, (0, start))
@@ -44,7 +57,10 @@ def dijkstra(grid: Grid, start: Coord, goal: Coord):
         if current in processed:
             continue
         processed.add(current)
-        visited_order.append(current)
+        if counting:
+            visited_count += 1
+        if on_visit is not None:
+            on_visit(current)
 
         if current == goal:
             break
@@ -54,7 +70,11 @@ def dijkstra(grid: Grid, start: Coord, goal: Coord):
             if new_dist < dist.get(neighbor, 10**18):
                 dist[neighbor] = new_dist
                 came_from[neighbor] = current
+                if counting:
+                    relaxed_count += 1
                 heapq.heappush(pq, (new_dist, neighbor))
 
+    trace.finish(visited_count, relaxed_count)
+
     path = reconstruct_path(came_from, start, goal)
-    return path, visited_order
+    return path, trace.visited_order
@@ -37,3 +37,25 @@ class Grid:
         for nxt in candidates:
             if self.in_bounds(nxt) and self.is_walkable(nxt):
                 yield nxt
+
+    def index(self, pos: Coord) -> int:
+        """Row-major flat index of pos."""
+        return pos[0] * self.width + pos[1]
+
+
+class PackedGrid(Grid):
+    def __init__(self, buf, height: int, width: int):
+        """
+        buf: row-major occupancy buffer, one byte per cell (bytes, bytearray,
+        memoryview, ...). Wrapped in a memoryview, not copied.
+        0 = free cell (walkable), anything else = wall
+        """
+        self.cells = memoryview(buf).cast("B")
+        self.height = height
+        self.width = width
+        if len(self.cells) != height * width:
+            raise ValueError(f"grid buffer has {len(self.cells)} cells, expected {height}x{width}")
+
+    def is_walkable(self, pos: Coord) -> bool:
+        r, c = pos
+        return self.cells[r * self.width + c] == 0
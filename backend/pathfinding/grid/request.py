@@ -0,0 +1,184 @@
+from __future__ import annotations
+
+from array import array
+import base64
+import binascii
+from dataclasses import dataclass
+import struct
+import sys
+import time
+from typing import Any, Dict, List, Optional
+
+from .grid import Grid, PackedGrid, Coord
+from .dijkstra import dijkstra
+from .astar import astar
+from pathfinding.trace import SearchTrace, TraceOptions, parse_trace_options
+
+
+class GridRequestError(ValueError):
+    """Bad grid request input (maps to HTTP 400)."""
+
+
+def _run_dijkstra(grid: Grid, start: Coord, goal: Coord, trace: SearchTrace):
+    path, visited = dijkstra(grid, start, goal, trace)
+    return path, visited, len(path) > 0
+
+
+def _run_astar(grid: Grid, start: Coord, goal: Coord, trace: SearchTrace):
+    visited, path, found = astar(grid, start, goal, trace)
+    return path, visited, found
+
+
+# name -> fn(grid, start, goal, trace) -> (path, visited_order, found)
+GRID_ALGORITHMS = {
+    "dijkstra": _run_dijkstra,
+    "astar": _run_astar,
+}
+
+# Binary body: little-endian int32 header, then height*width occupancy bytes
+BINARY_HEADER = struct.Struct("<6i")  # height, width, start_r, start_c, goal_r, goal_c
+
+OUTPUT_FORMATS = ("json", "packed")
+
+
+@dataclass
+class GridRequest:
+    grid: Grid
+    start: Coord
+    goal: Coord
+    algorithms: List[str]
+    trace_options: TraceOptions
+    output: str = "json"
+
+
+def _coord(value: Any, name: str) -> Coord:
+    if not (isinstance(value, list) and len(value) == 2 and all(isinstance(x, int) for x in value)):
+        raise GridRequestError(f"{name} must be [row,col] ints")
+    return (value[0], value[1])
+
+
+def _algorithms(value: Any) -> List[str]:
+    if isinstance(value, str):
+        value = [a for a in value.split(",") if a]
+    if not isinstance(value, list) or not value or not all(isinstance(a, str) and a in GRID_ALGORITHMS for a in value):
+        raise GridRequestError(f"algorithms must be a non-empty list of: {', '.join(GRID_ALGORITHMS)}")
+    return list(dict.fromkeys(value))
+
+
+def _finish(grid: Grid, start: Coord, goal: Coord, data: Dict[str, Any], algorithms: Any) -> GridRequest:
+    if not grid.in_bounds(start) or not grid.in_bounds(goal):
+        raise GridRequestError("start/goal out of bounds")
+    if not grid.is_walkable(start) or not grid.is_walkable(goal):
+        raise GridRequestError("start/goal must be on walkable cells (0)")
+
+    try:
+        trace_options = parse_trace_options(data)
+    except ValueError as e:
+        raise GridRequestError(str(e)) from None
+
+    output = data.get("output", "json")
+    if output not in OUTPUT_FORMATS:
+        raise GridRequestError(f"output must be one of: {', '.join(OUTPUT_FORMATS)}")
+
+    return GridRequest(grid, start, goal, _algorithms(algorithms), trace_options, output)
+
+
+def decode_json_request(data: Any, algorithms: Optional[List[str]] = None) -> GridRequest:
+    """
+    JSON body. The grid is either
+      "grid": 2D list of 0/1 (compatibility format), or
+      "grid_b64" + "height" + "width": base64 row-major bytes, one per cell
+    algorithms overrides the body's "algorithms" (fixed-algorithm endpoints).
+    """
+    if not isinstance(data, dict):
+        raise GridRequestError("Expected JSON body")
+
+    start = _coord(data.get("start"), "start")
+    goal = _coord(data.get("goal"), "goal")
+
+    if data.get("grid_b64") is not None:
+        height, width = data.get("height"), data.get("width")
+        if not all(isinstance(x, int) and not isinstance(x, bool) and x > 0 for x in (height, width)):
+            raise GridRequestError("height and width must be positive ints with grid_b64")
+        try:
+            raw = base64.b64decode(data["grid_b64"], validate=True)
+        except (binascii.Error, TypeError, ValueError):
+            raise GridRequestError("grid_b64 must be base64") from None
+        try:
+            grid: Grid = PackedGrid(raw, height, width)
+        except ValueError as e:
+            raise GridRequestError(str(e)) from None
+    else:
+        cells = data.get("grid")
+        if not isinstance(cells, list) or not cells or not all(isinstance(row, list) for row in cells):
+            raise GridRequestError("grid must be a 2D list")
+        grid = Grid(cells)
+
+    return _finish(grid, start, goal, data, algorithms if algorithms is not None else data.get("algorithms", ["dijkstra"]))
+
+
+def decode_binary_request(body: bytes, params: Dict[str, Any]) -> GridRequest:
+    """
+    application/octet-stream body: BINARY_HEADER followed by the occupancy
+    bytes, which are wrapped in place (no copy). Options (algorithms, trace,
+    output, ...) come from params, e.g. the query string.
+    """
+    if len(body) < BINARY_HEADER.size:
+        raise GridRequestError(f"binary body needs a {BINARY_HEADER.size}-byte header")
+    height, width, sr, sc, gr, gc = BINARY_HEADER.unpack_from(body)
+    if height <= 0 or width <= 0:
+        raise GridRequestError("height and width must be positive")
+
+    try:
+        grid = PackedGrid(memoryview(body)[BINARY_HEADER.size:], height, width)
+    except ValueError as e:
+        raise GridRequestError(str(e)) from None
+
+    data = dict(params)
+    for name in ("trace_sample_every", "trace_reservoir", "trace_seed"):
+        if name in data:
+            try:
+                data[name] = int(data[name])
+            except (TypeError, ValueError):
+                raise GridRequestError(f"{name} must be an int") from None
+    return _finish(grid, (sr, sc), (gr, gc), data, data.get("algorithms", "dijkstra"))
+
+
+def _pack_indices(grid: Grid, coords: List[Coord]) -> str:
+    """base64 of little-endian int32 row-major indices."""
+    buf = array("i", map(grid.index, coords))
+    if sys.byteorder == "big":
+        buf.byteswap()
+    return base64.b64encode(buf.tobytes()).decode("ascii")
+
+
+def solve_grid_request(req: GridRequest) -> Dict[str, Dict[str, Any]]:
+    """
+    Runs every requested algorithm on the same grid and returns
+    {algorithm: {path, visited, found, metrics}}. In "packed" output,
+    path/visited become path_idx/visited_idx: base64 int32 flat indices.
+    """
+    out: Dict[str, Dict[str, Any]] = {}
+    for name in req.algorithms:
+        trace = req.trace_options.new_trace()
+        t0 = time.perf_counter()
+        path, visited, found = GRID_ALGORITHMS[name](req.grid, req.start, req.goal, trace)
+        ms = (time.perf_counter() - t0) * 1000.0
+
+        res: Dict[str, Any] = {
+            "found": bool(found),
+            "metrics": {
+                "visited_count": trace.visited_count,
+                "path_length": max(0, len(path) - 1),
+                "runtime_ms": ms,
+            },
+        }
+        if req.output == "packed":
+            res["width"] = req.grid.width
+            res["visited_idx"] = _pack_indices(req.grid, visited)
+            res["path_idx"] = _pack_indices(req.grid, path)
+        else:
+            res["visited"] = [[r, c] for (r, c) in visited]
+            res["path"] = [[r, c] for (r, c) in path]
+        out[name] = res
+    return out
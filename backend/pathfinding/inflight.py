@@ -0,0 +1,128 @@
+# backend/pathfinding/inflight.py
+from __future__ import annotations
+
+import threading
+from typing import Any, Callable, Dict, Hashable, Optional, Tuple
+
+
+class Overloaded(Exception):
+    """Raised when a graph's admission queue is full or the wait timed out."""
+
+    def __init__(self, message: str, retry_after_s: float):
+        super().__init__(message)
+        self.retry_after_s = retry_after_s
+
+
+class _Call:
+    __slots__ = ("done", "result", "error")
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.result: Any = None
+        self.error: Optional[BaseException] = None
+
+
+class Coalescer:
+    """
+    Collapses identical in-flight calls: the first caller for a key runs fn,
+    later callers with the same key block until it finishes and share its
+    result (or its exception). Nothing is cached once the call completes.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._calls: Dict[Hashable, _Call] = {}
+
+    def run(self, key: Hashable, fn: Callable[[], Any]) -> Tuple[Any, bool]:
+        """Returns (result, shared); shared is True for callers that waited on another's run."""
+        with self._lock:
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = _Call()
+                self._calls[key] = call
+
+        if not leader:
+            call.done.wait()
+            if call.error is not None:
+                raise call.error
+            return call.result, True
+
+        try:
+            call.result = fn()
+        except BaseException as e:
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+            call.done.set()
+        return call.result, False
+
+
+class _Gate:
+    __slots__ = ("slots", "waiting", "running")
+
+    def __init__(self, max_concurrent: int):
+        self.slots = threading.BoundedSemaphore(max_concurrent)
+        self.waiting = 0
+        self.running = 0
+
+
+class AdmissionControl:
+    """
+    Per-key (per-graph) concurrency limit with a bounded wait queue.
+
+    At most max_concurrent calls run per key; up to max_queue more wait for a
+    slot for at most queue_timeout_s. Anything beyond that raises Overloaded
+    right away, so bursts turn into quick 429s instead of long tails.
+    Idle keys are forgotten, so keys may be as fine-grained as a tile corridor.
+    """
+
+    def __init__(self, max_concurrent: int = 2, max_queue: int = 16, queue_timeout_s: float = 10.0):
+        self.max_concurrent = max_concurrent
+        self.max_queue = max_queue
+        self.queue_timeout_s = queue_timeout_s
+        self._lock = threading.Lock()
+        self._gates: Dict[Hashable, _Gate] = {}
+
+    def run(self, key: Hashable, fn: Callable[[], Any]) -> Any:
+        with self._lock:
+            gate = self._gates.get(key)
+            if gate is None:
+                gate = _Gate(self.max_concurrent)
+                self._gates[key] = gate
+            # Fast path: free slot, no queueing
+            admitted = gate.slots.acquire(blocking=False)
+            if admitted:
+                gate.running += 1
+            elif gate.waiting >= self.max_queue:
+                raise Overloaded("too many queued requests for this graph", self.queue_timeout_s)
+            else:
+                gate.waiting += 1
+
+        if not admitted:
+            try:
+                admitted = gate.slots.acquire(timeout=self.queue_timeout_s)
+            finally:
+                with self._lock:
+                    gate.waiting -= 1
+                    if admitted:
+                        gate.running += 1
+                    else:
+                        self._drop_if_idle(key, gate)
+            if not admitted:
+                raise Overloaded("timed out waiting for a free slot on this graph", self.queue_timeout_s)
+
+        try:
+            return fn()
+        finally:
+            with self._lock:
+                gate.running -= 1
+                gate.slots.release()
+                self._drop_if_idle(key, gate)
+
+    def _drop_if_idle(self, key: Hashable, gate: _Gate) -> None:
+        # caller holds self._lock
+        if gate.running == 0 and gate.waiting == 0 and self._gates.get(key) is gate:
+            del self._gates[key]
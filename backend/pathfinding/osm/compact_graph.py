@@ -0,0 +1,157 @@
+# backend/pathfinding/osm/compact_graph.py
+from __future__ import annotations
+
+from array import array
+import math
+import threading
+from typing import Dict, Iterable, List, Tuple
+import weakref
+
+from pathfinding.osm.graph_adapter import NodeId
+
+# Same radius OSMnx uses for great_circle, so heuristics stay comparable.
+EARTH_RADIUS_M = 6_371_009.0
+
+
+class CompactGraph:
+    """
+    Array-backed (CSR) view of an OSMnx MultiDiGraph.
+
+    Nodes are renumbered 0..n-1; node_ids maps a dense index back to its OSM ID.
+    Per-node data lives in flat arrays, so per-query search state can be dense
+    arrays too instead of dicts keyed by 64-bit OSM IDs:
+      - offsets[i]..offsets[i+1] = slice of targets/weights for node i
+      - targets = int32 dense indices, weights = edge length in meters
+      - lat_rad / lon_rad = node coordinates in radians (heuristic)
+    Parallel edges collapse to the shortest one, like OSMGraphAdapter.neighbors.
+    """
+
+    __slots__ = ("node_ids", "index", "offsets", "targets", "weights", "lat_rad", "lon_rad", "_reverse", "__weakref__")
+
+    def __init__(
+        self,
+        node_ids: array,
+        index: Dict[NodeId, int],
+        offsets: array,
+        targets: array,
+        weights: array,
+        lat_rad: array,
+        lon_rad: array,
+    ):
+        self.node_ids = node_ids
+        self.index = index
+        self.offsets = offsets
+        self.targets = targets
+        self.weights = weights
+        self.lat_rad = lat_rad
+        self.lon_rad = lon_rad
+        self._reverse = None
+
+    @classmethod
+    def from_osm(cls, G) -> "CompactGraph":
+        node_ids = array("q", (int(n) for n in G.nodes))
+        index = {nid: i for i, nid in enumerate(node_ids)}
+
+        lat_rad = array("d")
+        lon_rad = array("d")
+        for nid in node_ids:
+            n = G.nodes[nid]
+            lat_rad.append(math.radians(float(n["y"])))
+            lon_rad.append(math.radians(float(n["x"])))
+
+        offsets = array("i", [0])
+        targets = array("i")
+        weights = array("d")
+        for nid in node_ids:
+            for v, key_dict in G[nid].items():
+                best = None
+                for _k, attrs in key_dict.items():
+                    length = attrs.get("length", None)
+                    if length is None:
+                        continue
+                    length = float(length)
+                    if best is None or length < best:
+                        best = length
+                if best is not None:
+                    targets.append(index[int(v)])
+                    weights.append(best)
+            offsets.append(len(targets))
+
+        return cls(node_ids, index, offsets, targets, weights, lat_rad, lon_rad)
+
+    def __len__(self) -> int:
+        return len(self.node_ids)
+
+    def idx(self, node: NodeId) -> int:
+        return self.index[int(node)]
+
+    def heuristic_m(self, i: int, goal: int) -> float:
+        # haversine great-circle distance in meters (admissible for road lengths)
+        lat1 = self.lat_rad[i]
+        lat2 = self.lat_rad[goal]
+        dlat = lat2 - lat1
+        dlon = self.lon_rad[goal] - self.lon_rad[i]
+        h = math.sin(dlat * 0.5) ** 2 + math.cos(lat1) * math.cos(lat2) * math.sin(dlon * 0.5) ** 2
+        return 2.0 * EARTH_RADIUS_M * math.asin(min(1.0, math.sqrt(h)))
+
+    def edge_length(self, i: int, j: int) -> float:
+        for e in range(self.offsets[i], self.offsets[i + 1]):
+            if self.targets[e] == j:
+                return self.weights[e]
+        raise KeyError((i, j))
+
+    def reverse(self) -> Tuple[array, array, array]:
+        """
+        Reverse CSR (offsets, sources, weights): the in-edges of node i are
+        sources[offsets[i]:offsets[i+1]]. Built once on first use.
+        """
+        if self._reverse is None:
+            n = len(self.node_ids)
+            counts = [0] * (n + 1)
+            for v in self.targets:
+                counts[v + 1] += 1
+            for i in range(n):
+                counts[i + 1] += counts[i]
+            offsets = array("i", counts)
+            fill = counts[:-1]
+            sources = array("i", [0]) * len(self.targets)
+            weights = array("d", [0.0]) * len(self.targets)
+            for u in range(n):
+                for e in range(self.offsets[u], self.offsets[u + 1]):
+                    v = self.targets[e]
+                    k = fill[v]
+                    sources[k] = u
+                    weights[k] = self.weights[e]
+                    fill[v] = k + 1
+            self._reverse = (offsets, sources, weights)
+        return self._reverse
+
+    def to_node_ids(self, indices: Iterable[int]) -> List[NodeId]:
+        ids = self.node_ids
+        return [int(ids[i]) for i in indices]
+
+    def nbytes(self) -> int:
+        # CSR + coordinate arrays; the OSM ID -> index dict is not counted
+        arrays = (self.node_ids, self.offsets, self.targets, self.weights, self.lat_rad, self.lon_rad)
+        return sum(a.itemsize * len(a) for a in arrays)
+
+
+_compact_lock = threading.Lock()
+_compact_graphs: "weakref.WeakKeyDictionary[object, CompactGraph]" = weakref.WeakKeyDictionary()
+
+
+def get_compact_graph(G) -> CompactGraph:
+    """
+    Returns the CompactGraph for G, building it once per graph object.
+    Entries go away together with the graph they were built from.
+    """
+    with _compact_lock:
+        cg = _compact_graphs.get(G)
+    if cg is not None:
+        return cg
+
+    # Build outside lock; worst case two threads build the same graph once each
+    cg = CompactGraph.from_osm(G)
+
+    with _compact_lock:
+        return _compact_graphs.setdefault(G, cg)
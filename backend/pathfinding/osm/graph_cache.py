@@ -2,6 +2,7 @@
 from __future__ import annotations
 
 from dataclasses import dataclass
+from pathlib import Path
 from typing import Dict, Tuple
 import threading
 import osmnx as ox
@@ -19,12 +20,16 @@ _graph_lock = threading.Lock()
 _graphs: Dict[GraphKey, object] = {}
 
 
+def graph_key(place: str, network: str) -> GraphKey:
+    return GraphKey(place=place.strip(), network=network.strip())
+
+
 def get_graph(place: str, network: str):
     """
     Returns a cached OSMnx graph for a place + network type.
     Caches in-memory so repeated requests are fast.
     """
-    key = GraphKey(place=place.strip(), network=network.strip())
+    key = graph_key(place, network)
 
     with _graph_lock:
         if key in _graphs:
@@ -39,4 +44,27 @@ def get_graph(place: str, network: str):
     with _graph_lock:
         _graphs[key] = G
 
-    return G
\ No newline at end of file
+    return G
+
+
+def load_graph_file(path: str, network: str = "file"):
+    """
+    Returns a cached OSMnx graph loaded from a local GraphML file
+    (e.g. one saved with ox.save_graphml). Works offline.
+    """
+    key = GraphKey(place=str(Path(path).resolve()), network=network.strip())
+
+    with _graph_lock:
+        if key in _graphs:
+            return _graphs[key]
+
+    G = ox.load_graphml(key.place)
+
+    # Files saved without lengths still need them for routing
+    if not all("length" in d for _u, _v, d in G.edges(data=True)):
+        G = ox.distance.add_edge_lengths(G)
+
+    with _graph_lock:
+        _graphs[key] = G
+
+    return G
@@ -1,13 +1,26 @@
 # backend/pathfinding/osm/routing.py
 from __future__ import annotations
 
-from typing import Dict, Any, List, Tuple
+from functools import partial
+from typing import Dict, Any, List, Optional, Tuple
 import time
 import osmnx as ox
 
 from pathfinding.osm.graph_adapter import OSMGraphAdapter
+from pathfinding.osm.compact_graph import get_compact_graph
 from pathfinding.graph.dijkstra_graph import dijkstra_graph
 from pathfinding.graph.astar_graph import astar_graph
+from pathfinding.graph.dijkstra_compact import dijkstra_compact
+from pathfinding.graph.astar_compact import astar_compact
+from pathfinding.graph.kernels import HAVE_NUMBA, astar_kernel, dijkstra_kernel
+from pathfinding.graph.alternatives import alternative_routes
+from pathfinding.trace import FULL_TRACE, TraceOptions
+
+
+# "dict": searches keep dicts/sets keyed by OSM IDs (OSMGraphAdapter)
+# "compact": dense int32/float64 arrays + bitset over a cached CompactGraph
+# "kernel": compact, run by the numba-compiled kernel when numba is installed
+STORAGE_MODES = ("dict", "compact", "kernel")
 
 
 def _nearest_node(G, lat: float, lon: float) -> int:
@@ -87,30 +100,71 @@ def route_compare_own(
     start_lat: float,
     start_lon: float,
     goal_lat: float,
-    goal_lon: float
+    goal_lon: float,
+    trace_options: Optional[TraceOptions] = None,
+    storage: str = "dict",
 ) -> Dict[str, Any]:
     """
     Runs Dijkstra and A* on the SAME OSM graph and returns:
     - final path polyline for each
     - explored road segments polyline for each (for animation)
     - metrics (distance, runtime, counts)
+
+    trace_options picks the recording level (default: full trace). Below "full"
+    explored_edges is empty or sampled; at "none" the counts are None.
+    storage picks the per-query search state layout (see STORAGE_MODES).
     """
-    adapter = OSMGraphAdapter(G)
+    s, g = snap_nodes(G, start_lat, start_lon, goal_lat, goal_lon)
+    return route_compare_nodes(G, s, g, trace_options, storage)
 
-    s = _nearest_node(G, start_lat, start_lon)
-    g = _nearest_node(G, goal_lat, goal_lon)
+
+def snap_nodes(G, start_lat: float, start_lon: float, goal_lat: float, goal_lon: float) -> Tuple[int, int]:
+    """Snaps start/goal coordinates to their nearest graph nodes."""
+    return _nearest_node(G, start_lat, start_lon), _nearest_node(G, goal_lat, goal_lon)
+
+
+def route_compare_nodes(
+    G,
+    s: int,
+    g: int,
+    trace_options: Optional[TraceOptions] = None,
+    storage: str = "dict",
+) -> Dict[str, Any]:
+    """route_compare_own for already snapped start/goal node IDs."""
+    if trace_options is None:
+        trace_options = FULL_TRACE
+    if storage not in STORAGE_MODES:
+        raise ValueError(f"storage must be one of: {', '.join(STORAGE_MODES)}")
+
+    adapter = OSMGraphAdapter(G)
 
     graph_nodes_count = int(getattr(G, "number_of_nodes", lambda: 0)())
     graph_edges_count = int(getattr(G, "number_of_edges", lambda: 0)())
 
+    cg = None
+    if storage == "kernel":
+        cg = get_compact_graph(G)
+        run_dijkstra = partial(dijkstra_kernel, cg, s, g)
+        run_astar = partial(astar_kernel, cg, s, g)
+    elif storage == "compact":
+        cg = get_compact_graph(G)
+        run_dijkstra = partial(dijkstra_compact, cg, s, g)
+        run_astar = partial(astar_compact, cg, s, g)
+    else:
+        run_dijkstra = partial(dijkstra_graph, adapter, s, g)
+        run_astar = partial(astar_graph, adapter, s, g)
+
+    d_trace = trace_options.new_trace()
+    a_trace = trace_options.new_trace()
+
     # --- Dijkstra ---
     t0 = time.perf_counter()
-    d_path_nodes, d_visited_nodes, d_dist, d_found, d_came_from, d_explored_edges = dijkstra_graph(adapter, s, g)
+    d_path_nodes, _d_visited, d_dist, d_found, _d_came_from, d_explored_edges = run_dijkstra(d_trace)
     t1 = time.perf_counter()
 
     # --- A* ---
     t2 = time.perf_counter()
-    a_path_nodes, a_visited_nodes, a_dist, a_found, a_came_from, a_explored_edges = astar_graph(adapter, s, g)
+    a_path_nodes, _a_visited, a_dist, a_found, _a_came_from, a_explored_edges = run_astar(a_trace)
     t3 = time.perf_counter()
 
     # convert path nodes to lat/lon (for final route)
@@ -127,9 +181,10 @@ def route_compare_own(
             "explored_edges": d_explored,
             "distance_m": float(d_dist),
             "runtime_ms": (t1 - t0) * 1000.0,
-            "visited_count": int(len(d_visited_nodes)),
+            "visited_count": d_trace.visited_count,
             "path_nodes_count": int(len(d_path_nodes)),
-            "explored_edges_count": int(len(d_explored_edges)),
+            "explored_edges_count": d_trace.relaxed_count,
+            "peak_memory_bytes": d_trace.peak_memory_bytes,
             "found": bool(d_found),
         },
         "astar": {
@@ -137,9 +192,10 @@ def route_compare_own(
             "explored_edges": a_explored,
             "distance_m": float(a_dist),
             "runtime_ms": (t3 - t2) * 1000.0,
-            "visited_count": int(len(a_visited_nodes)),
+            "visited_count": a_trace.visited_count,
             "path_nodes_count": int(len(a_path_nodes)),
-            "explored_edges_count": int(len(a_explored_edges)),
+            "explored_edges_count": a_trace.relaxed_count,
+            "peak_memory_bytes": a_trace.peak_memory_bytes,
             "found": bool(a_found),
         },
         "meta": {
@@ -147,5 +203,52 @@ def route_compare_own(
             "goal_node": int(g),
             "graph_nodes_count": graph_nodes_count,
             "graph_edges_count": graph_edges_count,
+            # shared per graph, unlike the per-query peak_memory_bytes
+            "compact_graph_bytes": cg.nbytes() if cg is not None else None,
+            "trace": trace_options.level.value,
+            "storage": storage,
+            "engine": "numba" if storage == "kernel" and HAVE_NUMBA else "python",
+        },
+    }
+
+
+def route_alternatives_nodes(
+    G,
+    s: int,
+    g: int,
+    k: int = 3,
+    method: str = "plateau",
+    max_stretch: float = 0.25,
+    max_overlap: float = 0.7,
+) -> Dict[str, Any]:
+    """
+    Shortest route plus up to k-1 alternatives between snapped nodes
+    (see alternative_routes), as lat/lon polylines with search-cost metrics.
+    """
+    adapter = OSMGraphAdapter(G)
+    res = alternative_routes(
+        get_compact_graph(G), s, g, k=k, method=method, max_stretch=max_stretch, max_overlap=max_overlap
+    )
+
+    return {
+        "routes": [
+            {
+                "path": _nodes_to_latlon(adapter, r["nodes"]),
+                "distance_m": r["distance_m"],
+                "stretch": r["stretch"],
+                "overlap": r["overlap"],
+                "path_nodes_count": len(r["nodes"]),
+            }
+            for r in res["routes"]
+        ],
+        "cost": res["cost"],
+        "meta": {
+            "start_node": int(s),
+            "goal_node": int(g),
+            "graph_nodes_count": int(getattr(G, "number_of_nodes", lambda: 0)()),
+            "graph_edges_count": int(getattr(G, "number_of_edges", lambda: 0)()),
+            "k": k,
+            "max_stretch": max_stretch,
+            "max_overlap": max_overlap,
         },
-    }
\ No newline at end of file
+    }
@@ -0,0 +1,425 @@
+# backend/pathfinding/osm/tiles.py
+from __future__ import annotations
+
+from collections import OrderedDict
+from dataclasses import dataclass
+import heapq
+import json
+import math
+from pathlib import Path
+import threading
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+import networkx as nx
+import osmnx as ox
+
+from pathfinding.osm.graph_adapter import NodeId
+from pathfinding.osm.graph_cache import GraphKey
+
+MANIFEST_NAME = "manifest.json"
+
+
+class OutsideTilesError(ValueError):
+    """Raised when a query's tiles are not part of the tile set."""
+
+
+class InvalidTileSetError(ValueError):
+    """Raised when a tile directory has no readable manifest."""
+
+
+@dataclass(frozen=True, order=True)
+class TileKey:
+    tx: int  # floor(lon / tile_deg)
+    ty: int  # floor(lat / tile_deg)
+
+    @property
+    def filename(self) -> str:
+        return f"tile_{self.tx}_{self.ty}.graphml"
+
+
+def tile_of(lat: float, lon: float, tile_deg: float) -> TileKey:
+    return TileKey(int(math.floor(lon / tile_deg)), int(math.floor(lat / tile_deg)))
+
+
+def _min_length(key_dict) -> Optional[float]:
+    best = None
+    for attrs in key_dict.values():
+        length = attrs.get("length", None)
+        if length is None:
+            continue
+        length = float(length)
+        if best is None or length < best:
+            best = length
+    return best
+
+
+def _dijkstra_lengths(adj: Dict[NodeId, Dict[NodeId, float]], source: NodeId) -> Dict[NodeId, float]:
+    dist = {source: 0.0}
+    pq = [(0.0, source)]
+    while pq:
+        d, u = heapq.heappop(pq)
+        if d > dist[u]:
+            continue
+        for v, w in adj.get(u, {}).items():
+            nd = d + w
+            if nd < dist.get(v, float("inf")):
+                dist[v] = nd
+                heapq.heappush(pq, (nd, v))
+    return dist
+
+
+def split_graph_into_tiles(G, out_dir: str, tile_deg: float = 0.05, network: str = "drive") -> Dict:
+    """
+    Splits an OSMnx graph into square lat/lon tiles under out_dir:
+      - tile_<tx>_<ty>.graphml per tile: nodes of the tile plus every edge
+        touching them (foreign endpoints come along as boundary nodes), so
+        composing neighbouring tiles restores the crossing edges
+      - manifest.json: tile size, tile list, boundary nodes and the overlay
+
+    The overlay is a coarse graph over boundary nodes (nodes with an edge
+    leaving their tile): crossing edges plus, per tile, exact shortest
+    distances between its boundary nodes through that tile. A shortest path on
+    the overlay names every tile the real shortest path passes through.
+    """
+    out = Path(out_dir)
+    out.mkdir(parents=True, exist_ok=True)
+
+    node_tile: Dict[NodeId, TileKey] = {}
+    for n, d in G.nodes(data=True):
+        node_tile[int(n)] = tile_of(float(d["y"]), float(d["x"]), tile_deg)
+
+    members: Dict[TileKey, Set[NodeId]] = {}
+    for n, t in node_tile.items():
+        members.setdefault(t, set()).add(n)
+
+    # Boundary nodes + crossing edges (shortest parallel edge)
+    boundary: Dict[TileKey, Set[NodeId]] = {t: set() for t in members}
+    overlay: Dict[Tuple[NodeId, NodeId], float] = {}
+    for u in G.nodes:
+        for v, key_dict in G[u].items():
+            tu, tv = node_tile[int(u)], node_tile[int(v)]
+            if tu == tv:
+                continue
+            w = _min_length(key_dict)
+            if w is None:
+                continue
+            boundary[tu].add(int(u))
+            boundary[tv].add(int(v))
+            overlay[(int(u), int(v))] = min(w, overlay.get((int(u), int(v)), float("inf")))
+
+    for t, nodes in members.items():
+        # Tile graph: own nodes + edges touching them
+        edges = set()
+        for u in nodes:
+            edges.update((u, v, k) for v, kd in G[u].items() for k in kd)
+            edges.update((w, u, k) for w, kd in G.pred[u].items() for k in kd)
+        H = G.edge_subgraph(edges).copy() if edges else G.subgraph(nodes).copy()
+        H.add_nodes_from((n, G.nodes[n]) for n in nodes)  # keep isolated nodes
+        ox.save_graphml(H, out / t.filename)
+
+        # Overlay cliques: boundary -> boundary distances inside the tile
+        bnodes = boundary[t]
+        if len(bnodes) < 2:
+            continue
+        adj: Dict[NodeId, Dict[NodeId, float]] = {}
+        for u in nodes:
+            for v, key_dict in G[u].items():
+                if int(v) in nodes:
+                    w = _min_length(key_dict)
+                    if w is not None:
+                        adj.setdefault(u, {})[int(v)] = w
+        for b in bnodes:
+            dist = _dijkstra_lengths(adj, b)
+            for b2 in bnodes:
+                if b2 != b and b2 in dist:
+                    overlay[(b, b2)] = min(dist[b2], overlay.get((b, b2), float("inf")))
+
+    manifest = {
+        "tile_deg": tile_deg,
+        "network": network,
+        "tiles": sorted([t.tx, t.ty] for t in members),
+        "boundary": {str(n): [node_tile[n].tx, node_tile[n].ty] for b in boundary.values() for n in b},
+        "overlay": [[u, v, w] for (u, v), w in overlay.items()],
+    }
+    with open(out / MANIFEST_NAME, "w", encoding="utf-8") as fh:
+        json.dump(manifest, fh)
+    return manifest
+
+
+class TiledGraphStore:
+    """
+    Loads tiles written by split_graph_into_tiles on demand and stitches the
+    ones a query needs into one graph.
+
+    Memory budget: max_tiles tile-equivalents. A loaded tile counts 1, and a
+    composed stitched graph counts its number of tiles, since it is a copy.
+    Least recently used stitched graphs go first, then loaded tiles. Stitched
+    graphs are kept (at most max_stitched) so repeated queries reuse the same
+    graph object and its CompactGraph. A single query that needs more than
+    max_tiles tiles still gets them; the budget is restored afterwards.
+    """
+
+    def __init__(self, tile_dir: str, max_tiles: int = 64, max_stitched: int = 8, direct_radius: int = 1):
+        self.tile_dir = Path(tile_dir)
+        try:
+            with open(self.tile_dir / MANIFEST_NAME, encoding="utf-8") as fh:
+                manifest = json.load(fh)
+
+            self.tile_deg = float(manifest["tile_deg"])
+            self.network = manifest.get("network", "drive")
+            self.tiles: Set[TileKey] = {TileKey(tx, ty) for tx, ty in manifest["tiles"]}
+            self.boundary_tile: Dict[NodeId, TileKey] = {
+                int(n): TileKey(tx, ty) for n, (tx, ty) in manifest["boundary"].items()
+            }
+            self.overlay: Dict[NodeId, Dict[NodeId, float]] = {}
+            for u, v, w in manifest["overlay"]:
+                self.overlay.setdefault(int(u), {})[int(v)] = float(w)
+        except (OSError, ValueError, KeyError, TypeError, AttributeError) as e:
+            raise InvalidTileSetError(f"{self.tile_dir.name}: missing or invalid {MANIFEST_NAME} ({e})") from None
+
+        self.key = GraphKey(place=str(self.tile_dir.resolve()), network=self.network)
+
+        self.max_tiles = max_tiles
+        self.max_stitched = max_stitched
+        # Queries whose tiles are at most this many tiles apart also get the margin box
+        self.direct_radius = direct_radius
+
+        self._lock = threading.Lock()
+        self._tile_graphs: "OrderedDict[TileKey, object]" = OrderedDict()
+        # (tile, reverse) -> in-tile adjacency; dropped with its tile
+        self._tile_adj: Dict[Tuple[TileKey, bool], Dict[NodeId, Dict[NodeId, float]]] = {}
+        self._stitched: "OrderedDict[frozenset, object]" = OrderedDict()
+
+    # ---- tile LRU ----
+
+    def load_tile(self, key: TileKey):
+        with self._lock:
+            if key in self._tile_graphs:
+                self._tile_graphs.move_to_end(key)
+                return self._tile_graphs[key]
+
+        H = ox.load_graphml(self.tile_dir / key.filename)
+
+        with self._lock:
+            self._tile_graphs[key] = H
+            self._tile_graphs.move_to_end(key)
+            self._evict()
+        return H
+
+    def _budget_used(self) -> int:
+        stitched = sum(len(keyset) for keyset in self._stitched if len(keyset) > 1)
+        return len(self._tile_graphs) + stitched
+
+    def _evict(self) -> None:
+        # caller holds self._lock
+        while len(self._stitched) > self.max_stitched:
+            self._stitched.popitem(last=False)
+        while self._budget_used() > self.max_tiles:
+            if self._stitched:
+                self._stitched.popitem(last=False)
+            elif len(self._tile_graphs) > 1:
+                old, _ = self._tile_graphs.popitem(last=False)
+                self._tile_adj.pop((old, False), None)
+                self._tile_adj.pop((old, True), None)
+            else:
+                break
+
+    def stitch(self, keys: Iterable[TileKey]):
+        keyset = frozenset(k for k in keys if k in self.tiles)
+        if not keyset:
+            raise OutsideTilesError("query lies outside the tiled region")
+
+        with self._lock:
+            if keyset in self._stitched:
+                self._stitched.move_to_end(keyset)
+                return self._stitched[keyset]
+
+        graphs = [self.load_tile(k) for k in sorted(keyset)]
+        G = graphs[0] if len(graphs) == 1 else nx.compose_all(graphs)
+
+        with self._lock:
+            self._stitched[keyset] = G
+            self._stitched.move_to_end(keyset)
+            self._evict()
+        return G
+
+    # ---- tile selection ----
+
+    def _box(self, a: TileKey, b: TileKey, margin: int) -> Set[TileKey]:
+        return {
+            TileKey(tx, ty)
+            for tx in range(min(a.tx, b.tx) - margin, max(a.tx, b.tx) + margin + 1)
+            for ty in range(min(a.ty, b.ty) - margin, max(a.ty, b.ty) + margin + 1)
+        } & self.tiles
+
+    def _own_adjacency(self, key: TileKey, reverse: bool) -> Dict[NodeId, Dict[NodeId, float]]:
+        with self._lock:
+            adj = self._tile_adj.get((key, reverse))
+        if adj is not None:
+            return adj
+
+        H = self.load_tile(key)
+        own = {int(n) for n, d in H.nodes(data=True) if tile_of(float(d["y"]), float(d["x"]), self.tile_deg) == key}
+        adj: Dict[NodeId, Dict[NodeId, float]] = {}
+        for u in own:
+            for v, key_dict in H[u].items():
+                if int(v) not in own:
+                    continue
+                w = _min_length(key_dict)
+                if w is None:
+                    continue
+                a, b = (int(v), u) if reverse else (u, int(v))
+                adj.setdefault(a, {})[b] = w
+
+        with self._lock:
+            if key in self._tile_graphs:
+                self._tile_adj[(key, reverse)] = adj
+        return adj
+
+    def _overlay_tiles(self, s_key: TileKey, s_node: NodeId, g_key: TileKey, g_node: NodeId) -> Optional[Set[TileKey]]:
+        """
+        Runs Dijkstra on the overlay, entered from s_node through its own tile
+        and left towards g_node through the goal tile. Returns the tiles on the
+        overlay shortest path ({s_key} when staying inside a shared tile is
+        shorter), or None if no route connects them.
+        """
+        source = _dijkstra_lengths(self._own_adjacency(s_key, reverse=False), s_node)
+        sink = _dijkstra_lengths(self._own_adjacency(g_key, reverse=True), g_node)
+
+        dist: Dict[NodeId, float] = {}
+        prev: Dict[NodeId, Optional[NodeId]] = {}
+        pq: List[Tuple[float, NodeId]] = []
+        for b, d in source.items():
+            if b in self.boundary_tile:
+                dist[b] = d
+                prev[b] = None
+                pq.append((d, b))
+        heapq.heapify(pq)
+
+        # Same tile: the route may stay inside it
+        best = source.get(g_node, float("inf")) if s_key == g_key else float("inf")
+        best_node = None
+        while pq:
+            d, u = heapq.heappop(pq)
+            if d > dist[u] or d >= best:
+                continue
+            if u in sink and d + sink[u] < best:
+                best = d + sink[u]
+                best_node = u
+            for v, w in self.overlay.get(u, {}).items():
+                nd = d + w
+                if nd < dist.get(v, float("inf")):
+                    dist[v] = nd
+                    prev[v] = u
+                    heapq.heappush(pq, (nd, v))
+
+        if best_node is None:
+            return {s_key} if best < float("inf") else None
+
+        keys = {s_key, g_key}
+        cur: Optional[NodeId] = best_node
+        while cur is not None:
+            keys.add(self.boundary_tile[cur])
+            cur = prev[cur]
+        return keys
+
+    def _snap(self, lat: float, lon: float) -> Optional[Tuple[NodeId, TileKey]]:
+        """
+        Nearest node to (lat, lon) in the tile graph it falls in (or in the
+        tiles around it when that tile has no nodes), with the node's own tile.
+        None if no tile is near.
+        """
+        key = tile_of(lat, lon, self.tile_deg)
+        if key in self.tiles:
+            H = self.load_tile(key)
+        else:
+            around = self._box(key, key, margin=1)
+            if not around:
+                return None
+            H = self.stitch(around)
+        node = int(ox.distance.nearest_nodes(H, X=lon, Y=lat))
+        d = H.nodes[node]
+        return node, tile_of(float(d["y"]), float(d["x"]), self.tile_deg)
+
+    def tiles_for_query(
+        self, start_lat: float, start_lon: float, goal_lat: float, goal_lon: float
+    ) -> Tuple[Set[TileKey], Optional[NodeId], Optional[NodeId]]:
+        """
+        Returns (tiles, start node, goal node), with start and goal snapped in
+        the tiles they fall in.
+
+        The tiles are those on the overlay shortest path, i.e. the tiles the
+        real shortest path passes through, so the stitched graph keeps it.
+        Queries within direct_radius tiles also get the box around both tiles
+        plus a one-tile margin. When a point is not near any tile, only that
+        box is returned and the nodes are None.
+        """
+        s = self._snap(start_lat, start_lon)
+        g = self._snap(goal_lat, goal_lon)
+        if s is None or g is None:
+            box = self._box(tile_of(start_lat, start_lon, self.tile_deg), tile_of(goal_lat, goal_lon, self.tile_deg), 1)
+            return box, None, None
+
+        (s_node, s_key), (g_node, g_key) = s, g
+        # None: the overlay cannot connect them, so no route exists anyway
+        keys = self._overlay_tiles(s_key, s_node, g_key, g_node) or {s_key, g_key}
+        if max(abs(s_key.tx - g_key.tx), abs(s_key.ty - g_key.ty)) <= self.direct_radius:
+            keys |= self._box(s_key, g_key, margin=1)
+        return keys, s_node, g_node
+
+    def route_graph(self, start_lat: float, start_lon: float, goal_lat: float, goal_lon: float):
+        """
+        Stitched graph for a start/goal query plus the snapped nodes to route
+        between. Returns (G, start node, goal node, tiles).
+        Raises OutsideTilesError if no tile is near the query.
+        """
+        keys, s_node, g_node = self.tiles_for_query(start_lat, start_lon, goal_lat, goal_lon)
+        G = self.stitch(keys)
+        if s_node is None or g_node is None:
+            s_node = int(ox.distance.nearest_nodes(G, X=start_lon, Y=start_lat))
+            g_node = int(ox.distance.nearest_nodes(G, X=goal_lon, Y=goal_lat))
+        return G, s_node, g_node, frozenset(k for k in keys if k in self.tiles)
+
+
+_store_lock = threading.Lock()
+_stores: Dict[str, TiledGraphStore] = {}
+
+
+def get_tiled_store(tile_dir: str, max_tiles: int = 64) -> TiledGraphStore:
+    """
+    Returns a cached TiledGraphStore for a tile directory, keyed on the
+    resolved path. The manifest is read only when the store is first built;
+    store.key is the GraphKey used by the rest of the routing code.
+    Raises InvalidTileSetError if the manifest is missing or malformed.
+    """
+    path = str(Path(tile_dir).resolve())
+
+    with _store_lock:
+        store = _stores.get(path)
+        if store is None:
+            store = TiledGraphStore(path, max_tiles=max_tiles)
+            _stores[path] = store
+    return store
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Split an OSM graph into routing tiles")
+    parser.add_argument("out_dir", help="directory to write tiles + manifest.json into")
+    src = parser.add_mutually_exclusive_group(required=True)
+    src.add_argument("--graphml", help="local GraphML file to split")
+    src.add_argument("--place", help="place name to download with OSMnx")
+    parser.add_argument("--network", default="drive")
+    parser.add_argument("--tile-deg", type=float, default=0.05)
+    args = parser.parse_args()
+
+    if args.graphml:
+        from pathfinding.osm.graph_cache import load_graph_file
+        G = load_graph_file(args.graphml, args.network)
+    else:
+        from pathfinding.osm.graph_cache import get_graph
+        G = get_graph(args.place, args.network)
+
+    m = split_graph_into_tiles(G, args.out_dir, tile_deg=args.tile_deg, network=args.network)
+    print(f"wrote {len(m['tiles'])} tiles, {len(m['boundary'])} boundary nodes, {len(m['overlay'])} overlay edges")
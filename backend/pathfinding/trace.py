@@ -0,0 +1,178 @@
+# backend/pathfinding/trace.py
+from __future__ import annotations
+
+from dataclasses import dataclass
+from enum import Enum
+import random
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+
+class TraceLevel(str, Enum):
+    """
+    How much of the search space a search records:
+      none    -> nothing (distance/path only)
+      counts  -> visited / relaxation counters (+ peak search memory) only
+      sampled -> counters + every k-th item, or a reservoir sample
+      full    -> counters + every visited node and relaxed edge (animation)
+    """
+    NONE = "none"
+    COUNTS = "counts"
+    SAMPLED = "sampled"
+    FULL = "full"
+
+
+DEFAULT_SAMPLE_EVERY = 10
+
+
+class _EveryK:
+    """Keeps items 0, k, 2k, ... in arrival order."""
+
+    __slots__ = ("k", "items", "_n")
+
+    def __init__(self, k: int):
+        self.k = k
+        self.items: List[Any] = []
+        self._n = 0
+
+    def offer(self, item: Any) -> None:
+        if self._n % self.k == 0:
+            self.items.append(item)
+        self._n += 1
+
+    def result(self) -> List[Any]:
+        return self.items
+
+
+class _Reservoir:
+    """Algorithm R reservoir sample; result() restores arrival order."""
+
+    __slots__ = ("size", "rng", "slots", "_n")
+
+    def __init__(self, size: int, rng: random.Random):
+        self.size = size
+        self.rng = rng
+        self.slots: List[Tuple[int, Any]] = []
+        self._n = 0
+
+    def offer(self, item: Any) -> None:
+        n = self._n
+        if n < self.size:
+            self.slots.append((n, item))
+        else:
+            j = self.rng.randint(0, n)
+            if j < self.size:
+                self.slots[j] = (n, item)
+        self._n = n + 1
+
+    def result(self) -> List[Any]:
+        return [item for _i, item in sorted(self.slots, key=lambda s: s[0])]
+
+
+class SearchTrace:
+    """
+    Recording sink handed to a search.
+
+    The algorithms ask for on_visit / on_relax once before their loop; both are
+    None unless the level keeps items, so the hot loop only pays for a None check
+    (and an integer increment when counting).
+    """
+
+    def __init__(self, options: "TraceOptions"):
+        self.level = options.level
+        self.counting = options.level is not TraceLevel.NONE
+
+        self.visited_count: Optional[int] = None
+        self.relaxed_count: Optional[int] = None
+        self.peak_memory_bytes: Optional[int] = None
+
+        self._nodes: Any = None
+        self._edges: Any = None
+        self.on_visit: Optional[Callable[[Any], None]] = None
+        self.on_relax: Optional[Callable[[Any], None]] = None
+
+        if options.level is TraceLevel.FULL:
+            self._nodes = []
+            self._edges = []
+            self.on_visit = self._nodes.append
+            self.on_relax = self._edges.append
+        elif options.level is TraceLevel.SAMPLED:
+            if options.reservoir_size is not None:
+                rng = random.Random(options.seed)
+                self._nodes = _Reservoir(options.reservoir_size, rng)
+                self._edges = _Reservoir(options.reservoir_size, rng)
+            else:
+                self._nodes = _EveryK(options.sample_every)
+                self._edges = _EveryK(options.sample_every)
+            self.on_visit = self._nodes.offer
+            self.on_relax = self._edges.offer
+
+    def finish(self, visited_count: int, relaxed_count: int, peak_memory_bytes: Optional[int] = None) -> None:
+        if self.counting:
+            self.visited_count = int(visited_count)
+            self.relaxed_count = int(relaxed_count)
+            if peak_memory_bytes is not None:
+                self.peak_memory_bytes = int(peak_memory_bytes)
+
+    @property
+    def visited_order(self) -> List[Any]:
+        if self._nodes is None:
+            return []
+        return self._nodes if isinstance(self._nodes, list) else self._nodes.result()
+
+    @property
+    def explored_edges(self) -> List[Any]:
+        if self._edges is None:
+            return []
+        return self._edges if isinstance(self._edges, list) else self._edges.result()
+
+
+@dataclass(frozen=True)
+class TraceOptions:
+    level: TraceLevel = TraceLevel.FULL
+    sample_every: int = DEFAULT_SAMPLE_EVERY
+    reservoir_size: Optional[int] = None
+    seed: Optional[int] = None
+
+    def new_trace(self) -> SearchTrace:
+        return SearchTrace(self)
+
+
+FULL_TRACE = TraceOptions()
+
+
+def _positive_int(value: Any, name: str) -> int:
+    if not isinstance(value, int) or isinstance(value, bool) or value < 1:
+        raise ValueError(f"{name} must be a positive int")
+    return value
+
+
+def parse_trace_options(data: Dict[str, Any]) -> TraceOptions:
+    """
+    Reads trace options from a request body:
+      trace:              "none" | "counts" | "sampled" | "full" (default "full")
+      trace_sample_every: keep every k-th item in sampled mode (default 10)
+      trace_reservoir:    reservoir size; switches sampled mode to reservoir sampling
+      trace_seed:         optional int seed for the reservoir
+
+    Raises ValueError on bad input.
+    """
+    raw = data.get("trace", TraceLevel.FULL.value)
+    try:
+        level = TraceLevel(raw)
+    except ValueError:
+        choices = ", ".join(lvl.value for lvl in TraceLevel)
+        raise ValueError(f"trace must be one of: {choices}") from None
+
+    sample_every = DEFAULT_SAMPLE_EVERY
+    if data.get("trace_sample_every") is not None:
+        sample_every = _positive_int(data["trace_sample_every"], "trace_sample_every")
+
+    reservoir_size = None
+    if data.get("trace_reservoir") is not None:
+        reservoir_size = _positive_int(data["trace_reservoir"], "trace_reservoir")
+
+    seed = data.get("trace_seed")
+    if seed is not None and (not isinstance(seed, int) or isinstance(seed, bool)):
+        raise ValueError("trace_seed must be an int")
+
+    return TraceOptions(level=level, sample_every=sample_every, reservoir_size=reservoir_size, seed=seed)
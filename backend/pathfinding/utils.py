@@ -1,7 +1,9 @@
 # backend/pathfinding/utils.py
 from __future__ import annotations
 
-from typing import Dict, List
+from array import array
+import sys
+from typing import Dict, List, Sequence
 
 from pathfinding.osm.graph_adapter import NodeId
 
@@ -22,4 +24,52 @@ def reconstruct_path_nodes(came_from: Dict[NodeId, NodeId], start: NodeId, goal:
         cur = came_from[cur]
         path.append(cur)
     path.reverse()
-    return path
\ No newline at end of file
+    return path
+
+
+def reconstruct_path_indices(parent: Sequence[int], start: int, goal: int) -> List[int]:
+    """
+    Same as reconstruct_path_nodes, over a dense parent array (-1 = no parent).
+    Works on dense indices; map back to OSM IDs afterwards.
+    """
+    if start == goal:
+        return [start]
+    if parent[goal] < 0:
+        return []
+
+    cur = goal
+    path = [cur]
+    while cur != start:
+        cur = parent[cur]
+        path.append(cur)
+    path.reverse()
+    return path
+
+
+def heap_peak_bytes(peak_len: int, sample_entry: tuple) -> int:
+    """Approximate bytes held by a heap of peak_len entries shaped like sample_entry."""
+    entry = sys.getsizeof(sample_entry) + sum(sys.getsizeof(x) for x in sample_entry)
+    return sys.getsizeof([]) + peak_len * (8 + entry)
+
+
+def container_bytes(*containers) -> int:
+    """
+    Approximate bytes held by per-query search containers, in O(1) per
+    container: array/bytearray count their buffers; dicts/sets count the
+    table plus len() boxed keys (and values), sized from one sample entry.
+
+    Together with heap_peak_bytes this is the one accounting rule behind
+    peak_memory_bytes for every engine: search state only (distances,
+    parents, settled set, heap at its peak), never the trace recording.
+    """
+    total = 0
+    for c in containers:
+        total += sys.getsizeof(c)
+        if isinstance(c, (array, bytearray)) or not c:
+            continue
+        if isinstance(c, dict):
+            k, v = next(iter(c.items()))
+            total += len(c) * (sys.getsizeof(k) + sys.getsizeof(v))
+        elif isinstance(c, (set, frozenset)):
+            total += len(c) * sys.getsizeof(next(iter(c)))
+    return total
@@ -0,0 +1,35 @@
+# backend/tests/osm_graphs.py
+"""Synthetic OSMnx-shaped graphs, so graph tests run offline."""
+import math
+import random
+
+import networkx as nx
+
+from pathfinding.osm.compact_graph import EARTH_RADIUS_M
+
+
+def _great_circle_m(lat1, lon1, lat2, lon2):
+    p1, p2 = math.radians(lat1), math.radians(lat2)
+    dlat = p2 - p1
+    dlon = math.radians(lon2 - lon1)
+    h = math.sin(dlat / 2) ** 2 + math.cos(p1) * math.cos(p2) * math.sin(dlon / 2) ** 2
+    return 2 * EARTH_RADIUS_M * math.asin(min(1.0, math.sqrt(h)))
+
+
+def random_osm_graph(seed, n=150, m=600):
+    """Seeded MultiDiGraph shaped like an OSMnx graph (y/x nodes, length edges)."""
+    rng = random.Random(seed)
+    G = nx.MultiDiGraph(crs="epsg:4326")
+    for i in range(n):
+        G.add_node(7_000_000_000 + 13 * i, y=52.0 + rng.random() * 0.05, x=4.3 + rng.random() * 0.05)
+    ids = list(G.nodes)
+    for _ in range(m):
+        u, v = rng.choice(ids), rng.choice(ids)
+        if u == v:
+            continue
+        # road length >= straight line keeps the A* heuristic admissible
+        straight = _great_circle_m(G.nodes[u]["y"], G.nodes[u]["x"], G.nodes[v]["y"], G.nodes[v]["x"])
+        G.add_edge(u, v, length=straight * (1.0 + rng.random()))
+        if rng.random() < 0.2:  # parallel edge, the longer one must be ignored
+            G.add_edge(u, v, length=straight * (2.5 + rng.random()))
+    return G
@@ -0,0 +1,88 @@
+# backend/tests/test_alternatives.py
+import itertools
+import random
+
+import pytest
+
+nx = pytest.importorskip("networkx")
+pytest.importorskip("osmnx")
+
+from pathfinding.graph.alternatives import ALTERNATIVE_METHODS, alternative_routes
+from pathfinding.osm.compact_graph import CompactGraph
+
+from osm_graphs import random_osm_graph
+
+SEEDS = range(5)
+QUERIES_PER_GRAPH = 8
+
+
+def _queries(G, seed):
+    rng = random.Random(2000 + seed)
+    ids = list(G.nodes)
+    return [tuple(rng.sample(ids, 2)) for _ in range(QUERIES_PER_GRAPH)]
+
+
+def _digraph(cg):
+    D = nx.DiGraph()
+    D.add_nodes_from(range(len(cg)))
+    for u in range(len(cg)):
+        for e in range(cg.offsets[u], cg.offsets[u + 1]):
+            D.add_edge(u, cg.targets[e], weight=cg.weights[e])
+    return D
+
+
+def _length(cg, nodes):
+    path = [cg.idx(n) for n in nodes]
+    return sum(cg.edge_length(a, b) for a, b in zip(path, path[1:]))
+
+
+def _edges(nodes):
+    return set(zip(nodes, nodes[1:]))
+
+
+@pytest.mark.parametrize("seed", SEEDS)
+def test_yen_matches_networkx(seed):
+    G = random_osm_graph(seed)
+    cg = CompactGraph.from_osm(G)
+    D = _digraph(cg)
+
+    for s, g in _queries(G, seed):
+        res = alternative_routes(cg, s, g, k=5, method="yen", max_stretch=100.0, max_overlap=1.0)
+        si, gi = cg.idx(s), cg.idx(g)
+        if not nx.has_path(D, si, gi):
+            assert res["routes"] == []
+            continue
+        want = list(itertools.islice(nx.shortest_simple_paths(D, si, gi, weight="weight"), 5))
+        assert [r["nodes"] for r in res["routes"]] == [cg.to_node_ids(p) for p in want]
+
+
+@pytest.mark.parametrize("seed", SEEDS)
+@pytest.mark.parametrize("method", ALTERNATIVE_METHODS)
+@pytest.mark.parametrize("max_stretch, max_overlap", [(0.25, 0.7), (0.5, 0.5), (1.0, 1.0)])
+def test_route_invariants(seed, method, max_stretch, max_overlap):
+    G = random_osm_graph(seed, n=300, m=1200)
+    cg = CompactGraph.from_osm(G)
+    D = _digraph(cg)
+
+    for s, g in _queries(G, seed):
+        routes = alternative_routes(cg, s, g, k=5, method=method, max_stretch=max_stretch, max_overlap=max_overlap)["routes"]
+        if not routes:
+            assert not nx.has_path(D, cg.idx(s), cg.idx(g))
+            continue
+
+        best = routes[0]["distance_m"]
+        assert best == pytest.approx(nx.shortest_path_length(D, cg.idx(s), cg.idx(g), weight="weight"))
+        assert [r["distance_m"] for r in routes] == sorted(r["distance_m"] for r in routes)
+        assert len({tuple(r["nodes"]) for r in routes}) == len(routes)
+
+        for r in routes:
+            nodes = r["nodes"]
+            assert nodes[0] == s and nodes[-1] == g
+            assert len(set(nodes)) == len(nodes)  # simple path
+            assert r["distance_m"] == pytest.approx(_length(cg, nodes))
+            assert r["distance_m"] <= (1.0 + max_stretch) * best * (1 + 1e-12)
+
+        for a, b in itertools.combinations(routes, 2):
+            shared_edges = _edges(a["nodes"]) & _edges(b["nodes"])
+            shared = sum(cg.edge_length(cg.idx(u), cg.idx(v)) for u, v in shared_edges)
+            assert shared <= max_overlap * min(a["distance_m"], b["distance_m"]) * (1 + 1e-9)
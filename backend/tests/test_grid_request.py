@@ -0,0 +1,42 @@
+# backend/tests/test_grid_request.py
+from array import array
+import base64
+import sys
+
+import pytest
+
+from pathfinding.grid.request import GridRequestError, decode_json_request, solve_grid_request
+
+OPEN_2X2 = base64.b64encode(bytes(4)).decode("ascii")
+
+
+def _unpack(b64):
+    buf = array("i")
+    buf.frombytes(base64.b64decode(b64))
+    if sys.byteorder == "big":
+        buf.byteswap()
+    return list(buf)
+
+
+@pytest.mark.parametrize("height, width", [(True, 2), (2, True), (0, 2), ("2", 2)])
+def test_grid_b64_rejects_bad_dimensions(height, width):
+    body = {"grid_b64": OPEN_2X2, "height": height, "width": width, "start": [0, 0], "goal": [1, 1]}
+    with pytest.raises(GridRequestError):
+        decode_json_request(body)
+
+
+@pytest.mark.parametrize("algorithms", [[{}], [["astar"]], [1], [], "unknown"])
+def test_rejects_bad_algorithms(algorithms):
+    body = {"grid": [[0, 0], [0, 0]], "start": [0, 0], "goal": [1, 1], "algorithms": algorithms}
+    with pytest.raises(GridRequestError):
+        decode_json_request(body)
+
+
+def test_packed_output_matches_json():
+    body = {"grid_b64": OPEN_2X2, "height": 2, "width": 2, "start": [0, 0], "goal": [1, 1], "algorithms": ["dijkstra", "astar"]}
+    as_json = solve_grid_request(decode_json_request(body))
+    packed = solve_grid_request(decode_json_request({**body, "output": "packed"}))
+
+    for name, res in as_json.items():
+        assert _unpack(packed[name]["path_idx"]) == [r * 2 + c for r, c in res["path"]]
+        assert _unpack(packed[name]["visited_idx"]) == [r * 2 + c for r, c in res["visited"]]
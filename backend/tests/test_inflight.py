@@ -0,0 +1,47 @@
+# backend/tests/test_inflight.py
+import threading
+import time
+
+import pytest
+
+from pathfinding.inflight import AdmissionControl, Coalescer, Overloaded
+
+
+def _burst(n, fn):
+    out = []
+    threads = [threading.Thread(target=lambda: out.append(fn())) for _ in range(n)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    return out
+
+
+def test_coalescer_shares_one_run():
+    calls = []
+
+    def work():
+        calls.append(1)
+        time.sleep(0.2)
+        return "result"
+
+    c = Coalescer()
+    out = _burst(5, lambda: c.run("key", work))
+    assert len(calls) == 1
+    assert sorted(shared for _res, shared in out) == [False, True, True, True, True]
+    assert {res for res, _shared in out} == {"result"}
+
+
+def test_admission_rejects_beyond_queue_and_forgets_idle_keys():
+    ac = AdmissionControl(max_concurrent=2, max_queue=1, queue_timeout_s=0.3)
+
+    def call():
+        try:
+            return ac.run(("corridor", 1), lambda: time.sleep(0.2) or "ok")
+        except Overloaded as e:
+            assert e.retry_after_s == pytest.approx(0.3)
+            return "429"
+
+    out = _burst(5, call)
+    assert sorted(out) == ["429", "429", "ok", "ok", "ok"]
+    assert ac._gates == {}
@@ -0,0 +1,85 @@
+# backend/tests/test_kernel_parity.py
+import math
+import random
+
+import pytest
+
+nx = pytest.importorskip("networkx")
+pytest.importorskip("osmnx")
+
+from pathfinding.graph import kernels
+from pathfinding.graph.astar_compact import astar_compact
+from pathfinding.graph.astar_graph import astar_graph
+from pathfinding.graph.dijkstra_compact import dijkstra_compact
+from pathfinding.graph.dijkstra_graph import dijkstra_graph
+from pathfinding.osm.compact_graph import CompactGraph
+from pathfinding.osm.graph_adapter import OSMGraphAdapter
+from pathfinding.trace import TraceLevel, TraceOptions
+
+from osm_graphs import random_osm_graph
+
+SEEDS = range(8)
+QUERIES_PER_GRAPH = 12
+
+
+def _queries(G, seed):
+    rng = random.Random(1000 + seed)
+    ids = list(G.nodes)
+    return [(rng.choice(ids), rng.choice(ids)) for _ in range(QUERIES_PER_GRAPH)]
+
+
+def _run(fn, graph, s, g):
+    trace = TraceOptions(level=TraceLevel.COUNTS).new_trace()
+    path, _visited, dist, found, _parents, _edges = fn(graph, s, g, trace)
+    return dist, found, path, trace.visited_count, trace.relaxed_count
+
+
+@pytest.fixture(params=["numba", "fallback"])
+def kernel_mode(request, monkeypatch):
+    if request.param == "numba":
+        if not kernels.HAVE_NUMBA:
+            pytest.skip("numba not installed")
+    else:
+        monkeypatch.setattr(kernels, "HAVE_NUMBA", False)
+    return request.param
+
+
+@pytest.mark.parametrize("seed", SEEDS)
+@pytest.mark.parametrize(
+    "reference, compact, kernel",
+    [
+        (dijkstra_graph, dijkstra_compact, "dijkstra_kernel"),
+        (astar_graph, astar_compact, "astar_kernel"),
+    ],
+    ids=["dijkstra", "astar"],
+)
+def test_kernel_matches_reference(kernel_mode, seed, reference, compact, kernel):
+    G = random_osm_graph(seed)
+    adapter = OSMGraphAdapter(G)
+    cg = CompactGraph.from_osm(G)
+    kernel_fn = getattr(kernels, kernel)
+
+    for s, g in _queries(G, seed):
+        ref = _run(reference, adapter, s, g)
+        for got in (_run(compact, cg, s, g), _run(kernel_fn, cg, s, g)):
+            dist, found, path, visited, relaxed = got
+            assert found == ref[1]
+            if found:
+                assert dist == pytest.approx(ref[0], rel=1e-12)
+            else:
+                assert math.isinf(dist)
+            assert path == ref[2]
+            assert visited == ref[3]
+            assert relaxed == ref[4]
+
+
+def test_kernel_full_trace_matches_compact(kernel_mode):
+    G = random_osm_graph(42)
+    cg = CompactGraph.from_osm(G)
+
+    for s, g in _queries(G, 42):
+        for compact, kernel in ((dijkstra_compact, kernels.dijkstra_kernel), (astar_compact, kernels.astar_kernel)):
+            want = compact(cg, s, g, TraceOptions().new_trace())
+            got = kernel(cg, s, g, TraceOptions().new_trace())
+            assert got[1] == want[1]  # visited_order
+            assert got[5] == want[5]  # explored_edges
@@ -0,0 +1,174 @@
+# backend/tests/test_tiles.py
+import json
+import math
+import random
+
+import pytest
+
+nx = pytest.importorskip("networkx")
+ox = pytest.importorskip("osmnx")
+
+from pathfinding.graph.dijkstra_compact import dijkstra_compact
+from pathfinding.osm.compact_graph import CompactGraph
+from pathfinding.osm.graph_cache import load_graph_file
+from pathfinding.osm.tiles import (
+    MANIFEST_NAME,
+    InvalidTileSetError,
+    OutsideTilesError,
+    TiledGraphStore,
+    TileKey,
+    split_graph_into_tiles,
+    tile_of,
+)
+from pathfinding.trace import TraceLevel, TraceOptions
+
+from osm_graphs import random_osm_graph
+
+TILE_DEG = 0.008
+
+
+@pytest.fixture(scope="module")
+def full_graph():
+    return random_osm_graph(3)
+
+
+@pytest.fixture(scope="module")
+def tile_dir(full_graph, tmp_path_factory):
+    out = tmp_path_factory.mktemp("tiles")
+    split_graph_into_tiles(full_graph, str(out), tile_deg=TILE_DEG, network="synthetic")
+    return out
+
+
+def _distance(G, s, g):
+    trace = TraceOptions(level=TraceLevel.COUNTS).new_trace()
+    return dijkstra_compact(CompactGraph.from_osm(G), s, g, trace)[2]
+
+
+def _random_point(rng):
+    return 52.0 + rng.random() * 0.05, 4.3 + rng.random() * 0.05
+
+
+def test_load_graph_file_roundtrip(full_graph, tmp_path):
+    path = tmp_path / "graph.graphml"
+    ox.save_graphml(full_graph, path)
+
+    G = load_graph_file(str(path))
+    assert set(G.nodes) == set(full_graph.nodes)
+    assert G.number_of_edges() == full_graph.number_of_edges()
+    assert load_graph_file(str(path)) is G
+
+
+def test_load_graph_file_adds_missing_lengths(full_graph, tmp_path):
+    H = full_graph.copy()
+    for _u, _v, d in H.edges(data=True):
+        del d["length"]
+    path = tmp_path / "no_lengths.graphml"
+    ox.save_graphml(H, path)
+
+    G = load_graph_file(str(path))
+    assert all(d["length"] > 0 for _u, _v, d in G.edges(data=True))
+
+
+def test_split_covers_graph(full_graph, tile_dir):
+    manifest = json.loads((tile_dir / MANIFEST_NAME).read_text(encoding="utf-8"))
+    node_tiles = {tile_of(d["y"], d["x"], TILE_DEG) for _n, d in full_graph.nodes(data=True)}
+    assert {TileKey(tx, ty) for tx, ty in manifest["tiles"]} == node_tiles
+
+    # Every node and every (parallel) edge survives in some tile
+    composed = nx.compose_all([ox.load_graphml(tile_dir / t.filename) for t in node_tiles])
+    assert set(composed.nodes) == set(full_graph.nodes)
+    assert set(composed.edges(keys=True)) == set(full_graph.edges(keys=True))
+
+
+@pytest.mark.parametrize("direct_radius", [0, 1, 3])
+def test_tiled_routes_match_full_graph(full_graph, tile_dir, direct_radius):
+    store = TiledGraphStore(str(tile_dir), direct_radius=direct_radius)
+    rng = random.Random(direct_radius)
+
+    for _ in range(90):
+        (slat, slon), (glat, glon) = _random_point(rng), _random_point(rng)
+        G, s, g, tiles = store.route_graph(slat, slon, glat, glon)
+        assert s in G and g in G
+        want = _distance(full_graph, s, g)
+        got = _distance(G, s, g)
+        if math.isinf(want):
+            assert math.isinf(got)
+        else:
+            assert got == pytest.approx(want, rel=1e-9)
+
+
+def test_outside_region_raises(tile_dir):
+    store = TiledGraphStore(str(tile_dir))
+    with pytest.raises(OutsideTilesError):
+        store.route_graph(10.0, 10.0, 10.001, 10.001)
+
+
+@pytest.mark.parametrize("manifest", [None, "{not json", '{"tiles": []}'])
+def test_invalid_manifest_raises(tmp_path, manifest):
+    if manifest is not None:
+        (tmp_path / MANIFEST_NAME).write_text(manifest, encoding="utf-8")
+    with pytest.raises(InvalidTileSetError):
+        TiledGraphStore(str(tmp_path))
+
+
+def test_tile_lru_stays_within_budget(tile_dir):
+    store = TiledGraphStore(str(tile_dir), max_tiles=6, max_stitched=2)
+    rng = random.Random(7)
+
+    for _ in range(40):
+        (slat, slon), (glat, glon) = _random_point(rng), _random_point(rng)
+        store.route_graph(slat, slon, glat, glon)
+        assert store._budget_used() <= store.max_tiles
+        assert len(store._stitched) <= store.max_stitched
+        assert {key for key, _reverse in store._tile_adj} <= set(store._tile_graphs)
+
+
+def test_stitched_lru_evicts_oldest(tile_dir):
+    store = TiledGraphStore(str(tile_dir), max_tiles=64, max_stitched=2)
+    a, b, c = sorted(store.tiles)[:3]
+
+    first = store.stitch([a, b])
+    store.stitch([b, c])
+    assert store.stitch([a, b]) is first  # hit refreshes it
+    store.stitch([a, c])
+    assert set(store._stitched) == {frozenset([a, b]), frozenset([a, c])}
+
+
+def test_tile_lru_evicts_oldest(tile_dir):
+    store = TiledGraphStore(str(tile_dir), max_tiles=3)
+    a, b, c, d = sorted(store.tiles)[:4]
+
+    for key in (a, b, c, a, d):
+        store.load_tile(key)
+    assert list(store._tile_graphs) == [c, a, d]
+
+
+@pytest.fixture
+def client(tile_dir, monkeypatch):
+    main = pytest.importorskip("main")
+    monkeypatch.setattr(main, "TILES_DIR", tile_dir.parent)
+    return main.app.test_client()
+
+
+@pytest.mark.parametrize("storage", ["dict", "compact"])
+def test_route_endpoint_on_tileset(client, tile_dir, storage):
+    body = {"tileset": tile_dir.name, "start": [52.01, 4.31], "goal": [52.04, 4.34], "trace": "none", "storage": storage}
+    r = client.post("/osm/route/compare", json=body)
+    assert r.status_code == 200
+    meta = r.get_json()["meta"]
+    assert meta["tileset"] == tile_dir.name
+    if storage == "compact":
+        assert meta["compact_graph_bytes"] > 0
+    else:
+        assert meta["compact_graph_bytes"] is None
+
+
+def test_route_endpoint_outside_tiles_is_400(client, tile_dir):
+    r = client.post("/osm/route/compare", json={"tileset": tile_dir.name, "start": [10, 10], "goal": [10, 10.001]})
+    assert r.status_code == 400
+
+
+def test_route_endpoint_without_manifest_is_400(client, tile_dir):
+    (tile_dir.parent / "empty_tileset").mkdir(exist_ok=True)
+    r = client.post("/osm/route/compare", json={"tileset": "empty_tileset", "start": [52.01, 4.31], "goal": [52.04, 4.34]})
+    assert r.status_code == 400